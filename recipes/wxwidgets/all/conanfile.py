@@ -1,14 +1,29 @@
 import glob
+import hashlib
 import json
 import os
 import re
+import shutil
+import sys
+from io import StringIO
 
 from conan import ConanFile
 from conan.errors import ConanException, ConanInvalidConfiguration
+from conan.tools.build import build_jobs, valid_min_cppstd
 from conan.tools.cmake import CMake, CMakeDeps, CMakeToolchain, cmake_layout
-from conan.tools.env import VirtualRunEnv
-from conan.tools.files import copy, get, rename, replace_in_file, rmdir
+from conan.tools.env import Environment, VirtualBuildEnv, VirtualRunEnv
+from conan.tools.files import (
+    check_sha1,
+    copy,
+    get,
+    rename,
+    replace_in_file,
+    rmdir,
+    save,
+    unzip,
+)
 from conan.tools.microsoft import is_msvc, is_msvc_static_runtime
+from conan.tools.scm import Version
 from conan.tools.system import package_manager
 
 required_conan_version = ">=1.62"
@@ -18,6 +33,194 @@ class ParseCMakeError(ConanException):
     pass
 
 
+# wxWidgets libraries: name -> (recipe option building it, wx libraries it uses)
+_WX_LIBRARIES = {
+    "base": (None, []),
+    "net": ("sockets", ["base"]),
+    "xml": ("xml", ["base"]),
+    "core": (None, ["base"]),
+    "adv": (None, ["core"]),
+    "aui": ("aui", ["core"]),
+    "gl": ("opengl", ["core"]),
+    "html": ("html", ["core"]),
+    "media": ("mediactrl", ["core"]),
+    "propgrid": ("propgrid", ["core"]),
+    "qa": ("debugreport", ["core", "xml"]),
+    "ribbon": ("ribbon", ["core"]),
+    "richtext": ("richtext", ["html", "xml"]),
+    "stc": ("stc", ["core"]),
+    "webview": ("webview", ["core"]),
+    "xrc": ("xrc", ["html", "xml"]),
+}
+
+# Targets that are always left out of unity builds. Bundled third-party code
+# relies on file-static helpers and macros that collide when merged.
+# Extend with conf user.wxwidgets:unity_build_exclusions = ["<target>", "<target>:<source>"]
+_UNITY_BUILD_EXCLUSIONS = [
+    "wxregex",
+    "wxscintilla",
+    "wxzlib",
+    "wxpng",
+    "wxjpeg",
+    "wxtiff",
+    "wxexpat",
+]
+
+# Headers in include/wx that are not meant to be included on their own
+_HEADER_CHECK_SKIP = [
+    "wx/afterstd.h",
+    "wx/beforestd.h",
+    "wx/chkconf.h",
+    "wx/setup_inc.h",
+]
+
+# Headers worth precompiling for code using a wx library, shipped as
+# res/pch/wx_pch_<library>.h together with those of the libraries it uses
+_PCH_HEADERS = {
+    "base": [
+        "wx/defs.h",
+        "wx/string.h",
+        "wx/arrstr.h",
+        "wx/hashmap.h",
+        "wx/log.h",
+        "wx/intl.h",
+        "wx/datetime.h",
+        "wx/filename.h",
+        "wx/event.h",
+        "wx/app.h",
+        "wx/thread.h",
+        "wx/stream.h",
+        "wx/utils.h",
+    ],
+    "core": ["wx/wx.h"],
+    "net": ["wx/socket.h", "wx/url.h", "wx/protocol/http.h"],
+    "xml": ["wx/xml/xml.h"],
+    "aui": ["wx/aui/aui.h"],
+    "gl": ["wx/glcanvas.h"],
+    "html": ["wx/html/htmlwin.h", "wx/html/htmprint.h"],
+    "media": ["wx/mediactrl.h"],
+    "propgrid": ["wx/propgrid/propgrid.h", "wx/propgrid/advprops.h"],
+    "qa": ["wx/debugrpt.h"],
+    "ribbon": ["wx/ribbon/bar.h", "wx/ribbon/buttonbar.h", "wx/ribbon/gallery.h"],
+    "richtext": ["wx/richtext/richtextctrl.h"],
+    "stc": ["wx/stc/stc.h"],
+    "webview": ["wx/webview.h"],
+    "xrc": ["wx/xrc/xmlres.h"],
+}
+
+# Library name postfixes for option build_types outside Windows, where wx names
+# the libraries of all configurations the same
+_CONFIG_POSTFIXES = {"Debug": "d", "RelWithDebInfo": "rd", "MinSizeRel": "s"}
+
+# Defines of options preset production and minimal, for the library and its
+# consumers alike: no asserts, no wxLogDebug/wxLogTrace
+_PRESET_DEFINES = {"wxDEBUG_LEVEL": 0, "wxUSE_LOG_DEBUG": 0, "wxUSE_LOG_TRACE": 0}
+
+# Features preset minimal turns off on top, debugreport needs the first two
+_PRESET_MINIMAL_DISABLES = [
+    "wxUSE_STACKWALKER",
+    "wxUSE_ON_FATAL_EXCEPTION",
+    "wxUSE_LOGGUI",
+    "wxUSE_LOGWINDOW",
+    "wxUSE_LOG_DIALOG",
+]
+
+# Headers (below include/wx-<version>) of each wx library besides base and core,
+# directories end with "/". Removed by option slim_package if the library is not built
+_LIBRARY_HEADERS = {
+    "net": [
+        "wx/protocol/",
+        "wx/fs_inet.h",
+        "wx/sckaddr.h",
+        "wx/sckipc.h",
+        "wx/sckstrm.h",
+        "wx/socket.h",
+        "wx/url.h",
+    ],
+    "xml": ["wx/xml/"],
+    "aui": ["wx/aui/"],
+    "gl": ["wx/glcanvas.h", "wx/gtk/glcanvas.h", "wx/msw/glcanvas.h", "wx/osx/glcanvas.h"],
+    "html": ["wx/html/", "wx/htmllbox.h", "wx/wxhtml.h"],
+    "media": ["wx/mediactrl.h"],
+    "propgrid": ["wx/propgrid/"],
+    "qa": ["wx/debugrpt.h"],
+    "ribbon": ["wx/ribbon/"],
+    "richtext": ["wx/richtext/"],
+    "stc": ["wx/stc/"],
+    "webview": [
+        "wx/webview.h",
+        "wx/webviewarchivehandler.h",
+        "wx/webviewfshandler.h",
+        "wx/gtk/webview_webkit.h",
+        "wx/msw/webview_edge.h",
+        "wx/msw/webview_ie.h",
+        "wx/osx/webview_webkit.h",
+    ],
+    "xrc": ["wx/xrc/"],
+}
+
+# Build module giving consumers wx::pch (precompiles everything in the package)
+# and wx_target_precompile_headers(<target> COMPONENTS <library>...)
+_PCH_CMAKE_MODULE = """\
+# Generated by conan recipe wxwidgets
+if(TARGET wx::pch)
+  set_property(TARGET wx::pch APPEND PROPERTY INTERFACE_PRECOMPILE_HEADERS
+    "$<$<COMPILE_LANGUAGE:CXX>:${CMAKE_CURRENT_LIST_DIR}/../pch/wx_pch.h>")
+endif()
+
+function(wx_target_precompile_headers target)
+  cmake_parse_arguments(PARSE_ARGV 1 _wx "" "" "COMPONENTS")
+  set(_dir "${CMAKE_CURRENT_FUNCTION_LIST_DIR}/../pch")
+  if(NOT _wx_COMPONENTS)
+    set(_headers "$<$<COMPILE_LANGUAGE:CXX>:${_dir}/wx_pch.h>")
+  endif()
+  foreach(_comp ${_wx_COMPONENTS})
+    if(NOT EXISTS "${_dir}/wx_pch_${_comp}.h")
+      message(FATAL_ERROR "wx_target_precompile_headers: no precompiled header for ${_comp}")
+    endif()
+    list(APPEND _headers "$<$<COMPILE_LANGUAGE:CXX>:${_dir}/wx_pch_${_comp}.h>")
+  endforeach()
+  target_precompile_headers(${target} PRIVATE ${_headers})
+endfunction()
+"""
+
+# Ninja launcher of every compile and link job: runs the job and appends its
+# peak RSS (KiB) and command line to a log read by _save_build_stats()
+_JOB_RSS_LAUNCHER = """\
+# Generated by conan recipe wxwidgets
+import resource
+import subprocess
+import sys
+
+returncode = subprocess.call(sys.argv[2:])
+# The job is the only child, its own children are included once waited for
+rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+if sys.platform == "darwin":
+    rss //= 1024
+with open(sys.argv[1], "a") as f:
+    f.write("%d\\t%s\\n" % (rss, "\\t".join(sys.argv[2:])))
+sys.exit(returncode)
+"""
+
+# Patches applied to the sources: (file, search, replace). Also part of the
+# key of the extracted sources cache (conf user.wxwidgets:source_cache_dir)
+_SOURCE_PATCHES = [
+    # Ensure to use FindEXPAT.cmake instead of expat-config.cmake
+    # (side effect of CMAKE_FIND_PACKAGE_PREFER_CONFIG ON, see https://github.com/conan-io/conan/issues/10387)
+    (
+        "build/cmake/lib/expat.cmake",
+        "find_package(EXPAT REQUIRED)",
+        "find_package(EXPAT REQUIRED MODULE)",
+    ),
+    (
+        "build/cmake/lib/nanosvg.cmake",
+        "find_package(NanoSVG REQUIRED)",
+        "find_package(nanosvg REQUIRED CONFIG)",
+    ),
+    ("build/cmake/lib/nanosvg.cmake", "NanoSVG::nanosvg", "nanosvg::nanosvg"),
+]
+
+
 def _CreateComp(name, target):
     return {
         "name": name,
@@ -32,9 +235,27 @@ def _CreateComp(name, target):
         "requires": [],
         "system_libs": [],
         "frameworks": [],
+        "alias": "",
     }
 
 
+def _WxLibFromFilename(filename):
+    """
+    Best effort mapping of a wx library file name to its library, e.g.
+    libwx_gtk3u_core-3.2.so -> core, wxbase32u.lib -> base, libwx_gtk3u-3.2.so -> mono
+    """
+    name = os.path.basename(filename).split(".")[0]
+    name = re.sub(r"(_vc\w*)?(-[\d.]+)?$", "", name)
+    parts = name.split("_")
+    if parts[-1] in _WX_LIBRARIES:
+        return parts[-1]
+    if "base" in parts[-1]:
+        return "base"
+    if len(parts) <= 2 and re.match(r"(lib)?wx_?(msw|gtk|osx|qt|x11|univ)", name):
+        return "mono"
+    return re.sub(r"^lib", "", name)
+
+
 def _CompStr(comp, os=""):
     str = "       component: %s\n" % (comp["name"])
     str += "          target: %s\n" % (comp["target"])
@@ -77,7 +298,6 @@ class wxwidgetsRecipe(ConanFile):
     """
     NOTES:
     Unsupported wxWidgets major options:
-        * monolithic -> OFF (default)
         * wxUSE_STL -> OFF (default)
         * wxUSE_LIBLZMA
 
@@ -157,6 +377,32 @@ class wxwidgetsRecipe(ConanFile):
         "fs_inet": [True, False],
         "custom_enables": ["ANY"],  # comma splitted list
         "custom_disables": ["ANY"],
+        "compiler_cache": ["off", "ccache", "sccache"],
+        "precompiled_headers": [True, False],
+        "unity_build": [True, False],
+        "unity_build_batch_size": ["ANY"],
+        "lto": ["off", "full", "thin"],
+        "monolithic": [True, False],
+        "split_debug": [True, False],
+        "components": ["ANY"],  # comma splitted list of wx libraries, e.g. "core,gl,aui"
+        # hidden: hidden visibility + --as-needed, symbolic: also -Bsymbolic-functions
+        "shared_link_profile": ["off", "hidden", "symbolic"],
+        "linker": ["default", "lld", "mold", "gold"],
+        "slim_package": [True, False],
+        "wxrc": [True, False],
+        # Profile-guided optimization, profiles in conf user.wxwidgets:pgo_profile_dir
+        "pgo": ["off", "generate", "use"],
+        # Static only, lets consumers drop unused code: on: --gc-sections,
+        # icf: also --icf=all (consumers must link with lld, gold or mold)
+        "gc_sections": ["off", "on", "icf"],
+        # Several configurations in one package, e.g. "Debug,Release"
+        "build_types": ["ANY"],
+        # Frame pointers and symbol tables for perf/eBPF stack walking,
+        # frame_pointers_noinline: also keeps single-caller functions out of line
+        "profiling": ["off", "frame_pointers", "frame_pointers_noinline"],
+        # production: wxDEBUG_LEVEL=0 without debug logging, minimal: also
+        # without stack walker, fatal exception handling and GUI logging
+        "preset": ["development", "production", "minimal"],
     }
 
     default_options = {
@@ -195,6 +441,23 @@ class wxwidgetsRecipe(ConanFile):
         "fs_inet": True,
         "custom_enables": "",
         "custom_disables": "",
+        "compiler_cache": "off",
+        "precompiled_headers": True,
+        "unity_build": False,
+        "unity_build_batch_size": "16",
+        "lto": "off",
+        "monolithic": False,
+        "split_debug": False,
+        "components": "",  # Empty: use the per-library options
+        "shared_link_profile": "off",
+        "linker": "default",
+        "slim_package": False,
+        "wxrc": True,
+        "pgo": "off",
+        "gc_sections": "off",
+        "build_types": "",  # Empty: settings.build_type only
+        "profiling": "off",
+        "preset": "development",
     }
 
     def validate(self):
@@ -203,14 +466,73 @@ class wxwidgetsRecipe(ConanFile):
             raise ConanInvalidConfiguration(
                 "This library is only compatible with %s" % (", ".join(compat_os))
             )
+        if self.options.unity_build and not str(
+            self.options.unity_build_batch_size
+        ).isdigit():
+            raise ConanInvalidConfiguration(
+                "unity_build_batch_size must be a number (0 for no limit)"
+            )
+        if self.options.get_safe("split_debug") and self.settings.compiler not in [
+            "gcc",
+            "clang",
+        ]:
+            raise ConanInvalidConfiguration("split_debug requires gcc or clang")
+        if self.settings.os == "Macos" and self.options.get_safe("linker") in [
+            "mold",
+            "gold",
+        ]:
+            raise ConanInvalidConfiguration(
+                f"linker={self.options.linker} is not available on Macos"
+            )
+        if str(self.options.build_types):
+            valid = ["Debug", "Release", "RelWithDebInfo", "MinSizeRel"]
+            if self.settings.os == "Windows":
+                # Release type libraries have the same names, only Debug adds "d"
+                valid = ["Debug", "Release"]
+            for build_type in self._build_types:
+                if build_type not in valid:
+                    raise ConanInvalidConfiguration(
+                        f"build_types: {build_type} is not one of {', '.join(valid)}"
+                    )
+            if str(self.settings.build_type) not in self._build_types:
+                raise ConanInvalidConfiguration(
+                    f"build_types must include build_type {self.settings.build_type}"
+                )
+            if is_msvc(self) and len({b == "Debug" for b in self._build_types}) > 1:
+                # All configurations link the dependencies of build_type, which
+                # use the runtime of one of them only (LNK2038 for the other)
+                raise ConanInvalidConfiguration(
+                    "build_types can't mix Debug and Release with msvc, they use "
+                    "different runtimes (/MDd, /MD)"
+                )
+        if self.settings.os == "Macos" and self.options.get_safe("gc_sections") == "icf":
+            raise ConanInvalidConfiguration("gc_sections=icf is not available on Macos")
+
+    def validate_build(self):
+        # Only building needs these, consumers of existing pgo binaries don't
+        if self.options.get_safe("pgo", "off") != "off":
+            compiler = self.settings.compiler
+            if compiler not in ["gcc", "clang", "apple-clang"] or (
+                compiler == "gcc" and Version(compiler.version) < "11"
+            ):
+                raise ConanInvalidConfiguration("pgo requires gcc >= 11 or clang")
+            if not self.conf.get("user.wxwidgets:pgo_profile_dir"):
+                raise ConanInvalidConfiguration(
+                    "pgo requires conf user.wxwidgets:pgo_profile_dir"
+                )
 
     def config_options(self):
         if self.settings.os == "Windows":
             self.options.rm_safe("fPIC")
+            self.options.rm_safe("linker")
+            self.options.rm_safe("pgo")
+            self.options.rm_safe("gc_sections")
         if self.settings.os != "Linux":
             self.options.rm_safe("cairo")
             self.options.rm_safe("gtk")
             self.options.rm_safe("glcanvas_egl")
+            self.options.rm_safe("split_debug")
+            self.options.rm_safe("shared_link_profile")
 
     def system_requirements(self):
         if self.settings.os != "Linux":
@@ -231,7 +553,8 @@ class wxwidgetsRecipe(ConanFile):
         pzyp = []  # pkgs.org: openSuse 15
         ppac = []  # pkgs.org: Arch
 
-        if self.options.webview:
+        libraries = self._library_options(self.options)
+        if libraries["webview"]:
             # libcurl-dev is a virtual package, user must select which to install...
             papt.extend(
                 ["libsoup2.4-dev", "libwebkit2gtk-4.0-dev"]
@@ -246,9 +569,9 @@ class wxwidgetsRecipe(ConanFile):
             pdnf.extend(["libsecret-devel"])
             pzyp.extend(["libsecret-devel"])
             ppac.extend(["libsecret"])
-        if self.options.mediactrl:
+        if libraries["mediactrl"]:
             papt.extend(["libgstreamer0.10-dev", "libgstreamer-plugins-base0.10-dev"])
-            pyum.extend(["gstreamer-devel"], ["gstreamer-plugins-base-devel"])
+            pyum.extend(["gstreamer-devel", "gstreamer-plugins-base-devel"])
             # pdnf.extend(['gstreamer1-devel'], ['gstreamer1-plugins-base-devel'])
             # pzyp.extend([''], [''])  # Fixme
             # ppac.extend(['gstreamer0.10'], ['gstreamer0.10-base-plugins']) # Chaotic repo... don't count on it
@@ -259,21 +582,108 @@ class wxwidgetsRecipe(ConanFile):
             pzyp.extend(["cairo-devel"])
             ppac.extend(["cairo"])
 
+        managers = {
+            "apt-get": (package_manager.Apt, papt),
+            "yum": (package_manager.Yum, pyum),
+            "dnf": (package_manager.Dnf, pdnf),
+            "zypper": (package_manager.Zypper, pzyp),
+            "pacman": (package_manager.PacMan, ppac),
+        }
+        # Detect the distro once and only deal with its package manager
         apt = package_manager.Apt(self)
-        yum = package_manager.Yum(self)
-        dnf = package_manager.Dnf(self)
-        zyp = package_manager.Zypper(self)
-        pac = package_manager.PacMan(self)
-        apt.install(papt, check=True)
-        yum.install(pyum, check=True)
-        dnf.install(pdnf, check=True)
-        zyp.install(pzyp, check=True)
-        pac.install(ppac, check=True)
+        tool = self.conf.get("tools.system.package_manager:tool") or apt.get_default_tool()
+        if tool not in managers:
+            return
+        cls, packages = managers[tool]
+        pm = apt if cls is package_manager.Apt else cls(self)
+        self._install_system_packages(pm, packages)
         return
 
+    def _install_system_packages(self, pm, packages):
+        """
+        Used from self.system_requirements(). All packages are checked with one query
+        and a stamp is saved when they are installed, so later runs with the same
+        packages on the same OS release skip the package manager entirely.
+        """
+        if not packages:
+            return
+        names = [pm.get_package_name(p) for p in packages]
+        if pm.tool_name == "apt-get":
+            query = "dpkg-query -W -f='${Package} ${db:Status-Status}\\n' "
+        elif pm.tool_name == "pacman":
+            query = "pacman -Q "
+        else:
+            query = "rpm -q --qf '%{NAME}\\n' "
+        query += " ".join(names)
+
+        if self.conf.get("user.wxwidgets:system_requirements_dry_run", check_type=bool):
+            install = pm.install_command.format(
+                sudo=pm.sudo_str,
+                tool=pm.tool_name,
+                packages=" ".join(names),
+                recommends="",
+            )
+            self.output.info("Check command: " + query)
+            self.output.info("Install command (for missing packages): " + install)
+            return
+
+        mode = self.conf.get("tools.system.package_manager:mode", default="check")
+        if mode not in ["check", "install"]:
+            # Report modes, let conan do the reporting
+            pm.install(packages, check=True)
+            return
+
+        stamp = None
+        stampdir = self.conf.get(
+            "user.wxwidgets:system_requirements_stamp_dir",
+            default=os.path.join(
+                os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+                "conan-wxwidgets",
+            ),
+        )
+        if stampdir:
+            osrelease = ""
+            if os.path.isfile("/etc/os-release"):
+                with open("/etc/os-release") as f:
+                    osrelease = f.read()
+            key = json.dumps(
+                [pm.tool_name, sorted(names), str(self.options.gtk), osrelease]
+            )
+            digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+            stamp = os.path.join(stampdir, f"sysreqs-{digest}.json")
+            if os.path.isfile(stamp):
+                self.output.info(f"System packages verified before ({stamp}), skipping")
+                return
+
+        out = StringIO()
+        self.run(query, stdout=out, stderr=StringIO(), quiet=True, ignore_errors=True)
+        installed = set()
+        for line in out.getvalue().splitlines():
+            parts = line.split()
+            if pm.tool_name == "apt-get":
+                if len(parts) == 2 and parts[1] == "installed":
+                    installed.add(parts[0])
+            elif len(parts) in [1, 2]:
+                installed.add(parts[0])
+        missing = [p for p, n in zip(packages, names) if n.split(":")[0] not in installed]
+        if missing:
+            # Fails in check mode, installs in install mode
+            pm.install(missing, check=True)
+
+        if stamp:
+            save(self, stamp, json.dumps({"tool": pm.tool_name, "packages": names}))
+
     def build_requirements(self):
-    	self.build_requires("cmake/[>=3.29 <4]")
+        self.build_requires("cmake/[>=3.29 <4]")
         self.build_requires("ninja/[>=1.10.1 <2]")
+        # Use the compiler cache from conan unless told to use one already installed
+        if self.options.compiler_cache != "off" and not self.conf.get(
+            "user.wxwidgets:compiler_cache_program"
+        ):
+            if self.options.compiler_cache == "ccache":
+                self.build_requires("ccache/[>=4.6 <5]")
+            elif self.options.compiler_cache == "sccache":
+                self.build_requires("sccache/[>=0.7 <1]")
 
     def requirements(self):
         if self.settings.os == "Linux":
@@ -283,7 +693,7 @@ class wxwidgetsRecipe(ConanFile):
             # Instead use the link libraries set by wx cmake
             self.requires("xorg/system", visible=False)
             self.requires("gtk/system", visible=False)
-            if self.options.opengl:
+            if self._library_options(self.options)["opengl"]:
                 self.requires("opengl/system", visible=False)
                 self.requires("glu/system", visible=False)
                 if self.options.glcanvas_egl:
@@ -334,13 +744,13 @@ class wxwidgetsRecipe(ConanFile):
             # Ignore targets opengl, glu, egl.. wx already link to required libraries
             # return True
         elif ld == 'opengl::opengl' or ld == 'opengl::gl':
-            if self.settings.os == 'Linux' and self.options.opengl:
+            if self.settings.os == 'Linux' and self._library_options(self.options)["opengl"]:
                 req = 'opengl'
         elif ld == 'opengl::glu':
-            if self.settings.os == 'Linux' and self.options.opengl:
+            if self.settings.os == 'Linux' and self._library_options(self.options)["opengl"]:
                 req = 'glu'
         elif ld == 'opengl::egl':
-            if self.settings.os == 'Linux' and self.options.opengl and self.options.glcanvas_egl:
+            if self.settings.os == 'Linux' and self._library_options(self.options)["opengl"] and self.options.glcanvas_egl:
                 req = 'egl'
         else:
             return False
@@ -350,32 +760,133 @@ class wxwidgetsRecipe(ConanFile):
         return True
 
     def source(self):
-        get(self, **self.conan_data["sources"][self.version], strip_root=True)
+        data = self.conan_data["sources"][self.version]
+        cache_dir = self.conf.get("user.wxwidgets:source_cache_dir")
+        if cache_dir:
+            key = json.dumps([self.version, data["sha1"], _SOURCE_PATCHES])
+            key = hashlib.sha256(key.encode()).hexdigest()[:16]
+            cached = os.path.join(cache_dir, f"{self.version}-{key}")
+            if os.path.isdir(cached):
+                self.output.info(f"Using cached source tree {cached}")
+                self._copy_tree(cached, self.source_folder, link=True)
+                return
+
+        self._get_sources(data)
+        for path, search, replace in _SOURCE_PATCHES:
+            replace_in_file(self, os.path.join(self.source_folder, path), search, replace)
+
+        if cache_dir:
+            # Copy (no links, the source folder could be removed or edited)
+            # under a temporary name so concurrent builds never see half a tree
+            tmp = f"{cached}.tmp{os.getpid()}"
+            self._copy_tree(self.source_folder, tmp, link=False)
+            try:
+                os.rename(tmp, cached)
+            except OSError:
+                # Another build stored the same tree meanwhile
+                rmdir(self, tmp)
+
+    def _get_sources(self, data):
+        """
+        Used from self.source() to download and extract the sources, trying the
+        mirror from conf user.wxwidgets:source_mirror first. The mirror is either
+        a local directory or a base URL, where the archive has the same file name
+        as upstream.
+        """
+        mirror = self.conf.get("user.wxwidgets:source_mirror")
+        filename = data["url"].rsplit("/", 1)[-1]
+        if mirror and os.path.isdir(mirror):
+            archive = os.path.join(mirror, filename)
+            if os.path.isfile(archive):
+                self.output.info(f"Using {archive} from source mirror")
+                check_sha1(self, archive, data["sha1"])
+                unzip(self, archive, destination=self.source_folder, strip_root=True)
+                return
+            self.output.warning(f"{filename} not found in source mirror {mirror}")
+            mirror = None
+        urls = [data["url"]]
+        if mirror:
+            urls.insert(0, f"{mirror.rstrip('/')}/{filename}")
+        get(self, url=urls, sha1=data["sha1"], strip_root=True)
+
+    def _copy_tree(self, src, dst, link):
+        """
+        Copy directory src to dst, hardlinking files if link is True and src and
+        dst are on the same file system
+        """
 
-        # Ensure to use FindEXPAT.cmake instead of expat-config.cmake
-        # (side effect of CMAKE_FIND_PACKAGE_PREFER_CONFIG ON, see https://github.com/conan-io/conan/issues/10387)
-        replace_in_file(
-            self,
-            os.path.join(self.source_folder, "build", "cmake", "lib", "expat.cmake"),
-            "find_package(EXPAT REQUIRED)",
-            "find_package(EXPAT REQUIRED MODULE)",
-        )
-        replace_in_file(
-            self,
-            os.path.join(self.source_folder, "build", "cmake", "lib", "nanosvg.cmake"),
-            "find_package(NanoSVG REQUIRED)",
-            "find_package(nanosvg REQUIRED CONFIG)",
-        )
-        replace_in_file(
-            self,
-            os.path.join(self.source_folder, "build", "cmake", "lib", "nanosvg.cmake"),
-            "NanoSVG::nanosvg",
-            "nanosvg::nanosvg",
+        def link_or_copy(s, d):
+            try:
+                os.link(s, d)
+            except OSError:
+                shutil.copy2(s, d)
+
+        shutil.copytree(
+            src,
+            dst,
+            symlinks=True,
+            dirs_exist_ok=True,
+            copy_function=link_or_copy if link else shutil.copy2,
         )
 
+    def _resolve_components(self, options):
+        """
+        Return option components with all wx libraries they depend on
+        (base and core are always built)
+        """
+        requested = [c.strip() for c in str(options.components).split(",") if c.strip()]
+        unknown = [c for c in requested if c not in _WX_LIBRARIES]
+        if unknown:
+            raise ConanInvalidConfiguration(
+                "Unknown wxWidgets components: %s (expected any of: %s)"
+                % (", ".join(unknown), ", ".join(_WX_LIBRARIES))
+            )
+        resolved = set()
+        pending = ["base", "core"] + requested
+        while pending:
+            name = pending.pop()
+            if name not in resolved:
+                resolved.add(name)
+                pending.extend(_WX_LIBRARIES[name][1])
+        return resolved
+
+    def _library_options(self, options):
+        """
+        Effective values of the options building wx libraries and of the
+        features needing one of them, option name -> bool. Options components
+        and preset take precedence over the per-library options, which can't
+        be changed in configure(). options is self.options or, in
+        package_id(), self.info.options
+        """
+        values = {
+            option: bool(options.get_safe(option))
+            for option, _ in _WX_LIBRARIES.values()
+            if option
+        }
+        for option in ["html_help", "url", "protocol", "fs_inet"]:
+            values[option] = bool(options.get_safe(option))
+        if str(options.get_safe("components", "")):
+            libs = self._resolve_components(options)
+            for name, (option, _) in _WX_LIBRARIES.items():
+                if option:
+                    values[option] = name in libs
+            if "html" not in libs:
+                values["html_help"] = False
+            if "net" not in libs:
+                values["url"] = False
+                values["protocol"] = False
+                values["fs_inet"] = False
+        if options.get_safe("preset") == "minimal":
+            # Needs the stack walker and fatal exception handling it turns off
+            values["debugreport"] = False
+        return values
+
     def configure(self):
         if self.options.shared:
             self.options.rm_safe("fPIC")
+            self.options.rm_safe("gc_sections")
+        else:
+            self.options.rm_safe("shared_link_profile")
 
         if self.settings.os == "Linux":
             self.options["gtk/system"].version = 3 if self.options.gtk == "gtk3" else 2
@@ -397,6 +908,90 @@ class wxwidgetsRecipe(ConanFile):
         if self.options.expat == "expat":
             self.options["expat/*"].shared = self.options.shared
 
+    def package_id(self):
+        # Compiler caching, PCH and unity batching do not change the produced binaries
+        del self.info.options.compiler_cache
+        del self.info.options.precompiled_headers
+        del self.info.options.unity_build
+        del self.info.options.unity_build_batch_size
+        self.info.options.rm_safe("linker")
+        # Expressed by the effective per-library options
+        libraries = self._library_options(self.info.options)
+        for option, value in libraries.items():
+            if self.info.options.get_safe(option) is not None:
+                setattr(self.info.options, option, value)
+        del self.info.options.components
+        build_types = str(self.info.options.build_types)
+        if build_types:
+            # The package holds all of them, in any order
+            del self.info.settings.build_type
+            self.info.options.build_types = ",".join(
+                sorted({b.strip() for b in build_types.split(",") if b.strip()})
+            )
+
+        custom = self._custom_wx_variables(self.info.options, self.info.settings)
+        self.info.options.custom_enables = ",".join(n for n, v in custom.items() if v)
+        self.info.options.custom_disables = ",".join(
+            n for n, v in custom.items() if not v
+        )
+
+        # Options without effect in this configuration
+        if self.info.settings.os != "Linux":
+            self.info.options.rm_safe("gtk")
+            self.info.options.rm_safe("cairo")
+            self.info.options.rm_safe("glcanvas_egl")
+        if not libraries["opengl"]:
+            self.info.options.rm_safe("glcanvas_egl")
+        if not libraries["html"]:
+            self.info.options.rm_safe("html_help")
+        if not libraries["sockets"]:
+            # wxWidgets turns these off without socket support
+            self.info.options.rm_safe("url")
+            self.info.options.rm_safe("protocol")
+            self.info.options.rm_safe("fs_inet")
+
+    def compatibility(self):
+        """
+        Existing binaries to use when the exact one is missing, in order of
+        preference: older compiler versions with the same C++ library ABI, a
+        lower compatibility level (a superset of the API) and, with conf
+        user.wxwidgets:release_fallback, Release for MinSizeRel/RelWithDebInfo
+        """
+        compatible = []
+        compiler = str(self.settings.compiler)
+        # Oldest compiler version with the ABI of newer ones
+        oldest = {"gcc": 5, "clang": 6, "apple-clang": 11, "msvc": 190}.get(compiler)
+        if compiler == "gcc" and (
+            not self.settings.get_safe("compiler.cppstd") or valid_min_cppstd(self, 17)
+        ):
+            # The C++17 ABI of gcc is stable since gcc 9 (also the default
+            # standard of gcc 11 and newer without compiler.cppstd)
+            oldest = 9
+        # LTO objects in static libraries only work with the same compiler version
+        if oldest and (self.options.shared or self.options.lto == "off"):
+            current = Version(self.settings.compiler.version).major
+            # One version per major, binaries are built with e.g. gcc 12, not 12.3
+            majors = {}
+            for v in self.settings.compiler.version.possible_values():
+                major = Version(v).major.value
+                if oldest <= major < current.value:
+                    if major not in majors or Version(v) < Version(majors[major]):
+                        majors[major] = v
+            for major in sorted(majors, reverse=True):
+                compatible.append({"settings": [("compiler.version", majors[major])]})
+
+        levels = ["2.8", "3.0", "3.1"]
+        for level in reversed(levels[: levels.index(str(self.options.compatibility))]):
+            compatible.append({"options": [("compatibility", level)]})
+
+        if (
+            self.settings.build_type in ["MinSizeRel", "RelWithDebInfo"]
+            and not str(self.options.build_types)
+            and self.conf.get("user.wxwidgets:release_fallback", check_type=bool)
+        ):
+            compatible.append({"settings": [("build_type", "Release")]})
+        return compatible
+
     def layout(self):
         cmake_layout(self, src_folder="src")
 
@@ -404,18 +999,43 @@ class wxwidgetsRecipe(ConanFile):
         def boolval(val):
             return "ON" if val else "OFF"
 
-        tc = CMakeToolchain(self, generator="Ninja")
+        if str(self.options.build_types):
+            tc = CMakeToolchain(self, generator="Ninja Multi-Config")
+            tc.cache_variables["CMAKE_CONFIGURATION_TYPES"] = ";".join(
+                self._build_types
+            )
+            # Library names must differ between configurations
+            if self.settings.os != "Windows":
+                for build_type in self._build_types:
+                    if build_type in _CONFIG_POSTFIXES:
+                        postfix = _CONFIG_POSTFIXES[build_type]
+                        tc.cache_variables[f"CMAKE_{build_type.upper()}_POSTFIX"] = postfix
+        else:
+            tc = CMakeToolchain(self, generator="Ninja")
         tc.variables["CMAKE_FIND_DEBUG_MODE"] = "OFF"
 
         tc.variables["wxBUILD_OPTIMISE"] = self.settings.build_type != "Debug"
         tc.variables["wxBUILD_SHARED"] = boolval(self.options.shared)
+        tc.variables["wxBUILD_MONOLITHIC"] = boolval(self.options.monolithic)
         tc.variables["wxBUILD_SAMPLES"] = False
         tc.variables["wxBUILD_TESTS"] = False
         tc.variables["wxBUILD_DEMOS"] = False
         tc.variables["wxBUILD_INSTALL"] = True
         tc.variables["wxBUILD_COMPATIBILITY"] = self.options.compatibility
-        if self.settings.compiler == "clang":
-            tc.variables["wxBUILD_PRECOMP"] = False
+        tc.variables["wxBUILD_PRECOMP"] = boolval(self.options.precompiled_headers)
+        if self.options.unity_build:
+            tc.variables["CMAKE_UNITY_BUILD"] = True
+            tc.variables["CMAKE_UNITY_BUILD_BATCH_SIZE"] = int(
+                str(self.options.unity_build_batch_size)
+            )
+        if self.options.lto != "off":
+            tc.variables["CMAKE_INTERPROCEDURAL_OPTIMIZATION"] = True
+            # Fail configure rather than silently building without LTO
+            tc.variables["CMAKE_POLICY_DEFAULT_CMP0069"] = "NEW"
+        if self.options.compiler_cache != "off":
+            self._setup_compiler_cache(tc)
+        tc.variables["CMAKE_JOB_POOL_COMPILE"] = "compile"
+        tc.variables["CMAKE_JOB_POOL_LINK"] = "link"
 
         # platform-specific options
         if is_msvc(self):
@@ -424,69 +1044,825 @@ class wxwidgetsRecipe(ConanFile):
             tc.variables["wxBUILD_VENDOR"] = ""
         if self.settings.os == "Linux":
             tc.variables["wxBUILD_TOOLKIT"] = self.options.gtk
-            tc.variables["wxUSE_CAIRO"] = self.options.cairo
-            tc.variables["wxUSE_GLCANVAS_EGL"] = self.options.glcanvas_egl
+            if self.options.split_debug:
+                tc.extra_cflags.append("-gsplit-dwarf")
+                tc.extra_cxxflags.append("-gsplit-dwarf")
+        linker = self.options.get_safe("linker", "default")
+        if linker != "default":
+            # Found by self.build() in the build environment
+            tc.variables["CMAKE_LINKER_TYPE"] = str(linker).upper()
+        if self.options.get_safe("shared_link_profile", "off") != "off":
+            # Fewer exported symbols and DT_NEEDED entries, less work for ld.so
+            tc.variables["CMAKE_C_VISIBILITY_PRESET"] = "hidden"
+            tc.variables["CMAKE_CXX_VISIBILITY_PRESET"] = "hidden"
+            tc.variables["CMAKE_VISIBILITY_INLINES_HIDDEN"] = True
+            tc.extra_sharedlinkflags.append("-Wl,--as-needed")
+            tc.extra_exelinkflags.append("-Wl,--as-needed")
+            if self.options.shared_link_profile == "symbolic":
+                tc.extra_sharedlinkflags.append("-Wl,-Bsymbolic-functions")
+        if self.options.get_safe("gc_sections", "off") != "off":
+            # Every function and variable in its own section, see package_info()
+            for flag in ["-ffunction-sections", "-fdata-sections"]:
+                tc.extra_cflags.append(flag)
+                tc.extra_cxxflags.append(flag)
+        if self.options.get_safe("pgo", "off") != "off":
+            flags = self._pgo_flags()
+            tc.extra_cflags.extend(flags)
+            tc.extra_cxxflags.extend(flags)
+            # Needed at link time too, for the profile runtime and with LTO
+            tc.extra_sharedlinkflags.extend(flags)
+            tc.extra_exelinkflags.extend(flags)
+        if self.options.preset != "development":
+            # Also exported to consumers by package_info()
+            tc.variables["wxBUILD_DEBUG_LEVEL"] = str(_PRESET_DEFINES["wxDEBUG_LEVEL"])
+            for name, value in _PRESET_DEFINES.items():
+                if name != "wxDEBUG_LEVEL":
+                    tc.preprocessor_definitions[name] = value
+        if self.options.profiling != "off":
+            flags = self._profiling_flags()
+            tc.extra_cflags.extend(flags)
+            tc.extra_cxxflags.extend(flags)
+        if self.settings.compiler == "clang" and self.conf.get(
+            "user.wxwidgets:time_trace", check_type=bool
+        ):
+            # Per TU frontend/backend times for build_stats.json
+            tc.extra_cflags.append("-ftime-trace")
+            tc.extra_cxxflags.append("-ftime-trace")
+        for name, value in self._wx_use_variables(self.options, self.settings).items():
+            tc.variables[name] = value
+        # After the options above, so these override them
+        for name, value in self._custom_wx_variables(self.options, self.settings).items():
+            tc.variables[name] = value
+
+        if self.conf.get("user.wxwidgets:configure_cache_dir"):
+            fn = os.path.join(self.generators_folder, "configure_fingerprint.json")
+            save(self, fn, json.dumps(self._configure_fingerprint(), indent=2))
+
+        fn = os.path.join(self.generators_folder, "wxwidgets_project_include.cmake")
+        save(self, fn, self._cmake_project_include())
+        tc.variables["CMAKE_PROJECT_wxWidgets_INCLUDE"] = fn.replace("\\", "/")
+
+        tc.generate()
+
+        deps = CMakeDeps(self)
+        if str(self.options.build_types):
+            # Every configuration uses the dependencies of settings.build_type
+            for build_type in self._build_types:
+                deps.configuration = build_type
+                deps.generate()
+        else:
+            deps.generate()
+
+        ms = VirtualRunEnv(self)
+        ms.generate()
+
+    def _wx_use_variables(self, options, settings):
+        """
+        wxUSE_* CMake variables derived from the dedicated options. options and
+        settings are self.options/self.settings or, in package_id(), their
+        self.info counterparts
+        """
+        variables = {}
+        libraries = self._library_options(options)
+        if settings.os == "Linux":
+            variables["wxUSE_CAIRO"] = bool(options.get_safe("cairo"))
+            variables["wxUSE_GLCANVAS_EGL"] = bool(options.get_safe("glcanvas_egl"))
         # Disable some optional libraries that will otherwise lead to non-deterministic builds
-        if self.settings.os != "Windows":
-            tc.variables["wxUSE_LIBSDL"] = False
-            tc.variables["wxUSE_LIBICONV"] = False
-            tc.variables["wxUSE_LIBNOTIFY"] = False
-            tc.variables["wxUSE_LIBMSPACK"] = False
-            tc.variables["wxUSE_LIBGNOMEVFS"] = False
-
-        tc.variables["wxUSE_LIBPNG"] = "sys" if self.options.png != "off" else "OFF"
-        tc.variables["wxUSE_LIBJPEG"] = "sys" if self.options.jpeg != "off" else "OFF"
-        tc.variables["wxUSE_LIBTIFF"] = "sys" if self.options.tiff != "off" else "OFF"
-        tc.variables["wxUSE_NANOSVG"] = (
-            "sys" if self.options.nanosvg != "off" else "OFF"
-        )
-        tc.variables["wxUSE_ZLIB"] = "sys" if self.options.zlib != "off" else "OFF"
-        tc.variables["wxUSE_EXPAT"] = "sys" if self.options.expat != "off" else "OFF"
-        tc.variables["wxUSE_REGEX"] = self.options.regex
+        if settings.os != "Windows":
+            variables["wxUSE_LIBSDL"] = False
+            variables["wxUSE_LIBICONV"] = False
+            variables["wxUSE_LIBNOTIFY"] = False
+            variables["wxUSE_LIBMSPACK"] = False
+            variables["wxUSE_LIBGNOMEVFS"] = False
+
+        variables["wxUSE_LIBPNG"] = "sys" if options.png != "off" else "OFF"
+        variables["wxUSE_LIBJPEG"] = "sys" if options.jpeg != "off" else "OFF"
+        variables["wxUSE_LIBTIFF"] = "sys" if options.tiff != "off" else "OFF"
+        variables["wxUSE_NANOSVG"] = "sys" if options.nanosvg != "off" else "OFF"
+        variables["wxUSE_ZLIB"] = "sys" if options.zlib != "off" else "OFF"
+        variables["wxUSE_EXPAT"] = "sys" if options.expat != "off" else "OFF"
+        variables["wxUSE_REGEX"] = str(options.regex)
 
         # wxWidgets features
-        tc.variables["wxUSE_UNICODE"] = self.options.unicode
-        tc.variables["wxUSE_SECRETSTORE"] = self.options.secretstore
+        variables["wxUSE_UNICODE"] = bool(options.unicode)
+        variables["wxUSE_SECRETSTORE"] = bool(options.secretstore)
+        if options.preset == "minimal":
+            for name in _PRESET_MINIMAL_DISABLES:
+                variables[name] = False
 
         # wxWidgets libraries
-        tc.variables["wxUSE_AUI"] = self.options.aui
-        tc.variables["wxUSE_OPENGL"] = self.options.opengl
-        tc.variables["wxUSE_HTML"] = self.options.html
-        tc.variables["wxUSE_MEDIACTRL"] = self.options.mediactrl
-        tc.variables["wxUSE_PROPGRID"] = self.options.propgrid
-        tc.variables["wxUSE_DEBUGREPORT"] = self.options.debugreport
-        tc.variables["wxUSE_RIBBON"] = self.options.ribbon
-        tc.variables["wxUSE_RICHTEXT"] = self.options.richtext
-        tc.variables["wxUSE_SOCKETS"] = self.options.sockets
-        tc.variables["wxUSE_STC"] = self.options.stc
-        tc.variables["wxUSE_WEBVIEW"] = self.options.webview
-        tc.variables["wxUSE_XML"] = self.options.xml
-        tc.variables["wxUSE_XRC"] = self.options.xrc
-        tc.variables["wxUSE_HELP"] = self.options.help
-        tc.variables["wxUSE_WXHTML_HELP"] = self.options.html_help
-        tc.variables["wxUSE_URL"] = self.options.protocol
-        tc.variables["wxUSE_PROTOCOL"] = self.options.protocol
-        tc.variables["wxUSE_FS_INET"] = self.options.fs_inet
-
-        for item in str(self.options.custom_enables).split(","):
-            if len(item) > 0:
-                tc.variables[item] = True
-        for item in str(self.options.custom_disables).split(","):
-            if len(item) > 0:
-                tc.variables[item] = False
+        variables["wxUSE_AUI"] = libraries["aui"]
+        variables["wxUSE_OPENGL"] = libraries["opengl"]
+        variables["wxUSE_HTML"] = libraries["html"]
+        variables["wxUSE_MEDIACTRL"] = libraries["mediactrl"]
+        variables["wxUSE_PROPGRID"] = libraries["propgrid"]
+        variables["wxUSE_DEBUGREPORT"] = libraries["debugreport"]
+        variables["wxUSE_RIBBON"] = libraries["ribbon"]
+        variables["wxUSE_RICHTEXT"] = libraries["richtext"]
+        variables["wxUSE_SOCKETS"] = libraries["sockets"]
+        variables["wxUSE_STC"] = libraries["stc"]
+        variables["wxUSE_WEBVIEW"] = libraries["webview"]
+        variables["wxUSE_XML"] = libraries["xml"]
+        variables["wxUSE_XRC"] = libraries["xrc"]
+        variables["wxUSE_HELP"] = bool(options.help)
+        variables["wxUSE_WXHTML_HELP"] = libraries["html_help"]
+        variables["wxUSE_URL"] = libraries["url"]
+        variables["wxUSE_PROTOCOL"] = libraries["protocol"]
+        variables["wxUSE_FS_INET"] = libraries["fs_inet"]
+        return variables
+
+    def _custom_wx_variables(self, options, settings):
+        """
+        Variables from options custom_enables/custom_disables, name -> bool.
+        Trimmed, deduplicated and sorted, a disable wins over an enable of the
+        same variable. Leaves out what the dedicated options already set.
+        """
+        variables = {}
+        for option, value in [("custom_enables", True), ("custom_disables", False)]:
+            for item in str(options.get_safe(option, "")).split(","):
+                if item.strip():
+                    variables[item.strip()] = value
+
+        implied = self._wx_use_variables(options, settings)
+
+        def is_implied(name, value):
+            current = implied.get(name)
+            return current is value or (current == "OFF" and not value)
+
+        return {
+            name: value
+            for name, value in sorted(variables.items())
+            if not is_implied(name, value)
+        }
+
+    @property
+    def _compiler_cache_program(self):
+        return self.conf.get(
+            "user.wxwidgets:compiler_cache_program",
+            default=str(self.options.compiler_cache),
+        )
 
-        tc.generate()
+    def _setup_compiler_cache(self, tc):
+        """
+        Used from self.generate() to set up ccache/sccache as compiler launcher.
+        Paths below the common source/build folder are made relative so that
+        the cache key doesn't depend on where the package is built.
+        """
+        program = self._compiler_cache_program
+        tc.variables["CMAKE_C_COMPILER_LAUNCHER"] = program
+        tc.variables["CMAKE_CXX_COMPILER_LAUNCHER"] = program
+
+        basedir = os.path.dirname(self.source_folder)
+        cachedir = self.conf.get("user.wxwidgets:compiler_cache_dir")
+        if self.settings.compiler in ["gcc", "clang", "apple-clang"]:
+            # Keep absolute paths out of objects (__FILE__, debug info)
+            prefix_map = f"-ffile-prefix-map={basedir}=."
+            tc.extra_cflags.append(prefix_map)
+            tc.extra_cxxflags.append(prefix_map)
+
+        if self.options.precompiled_headers and self.settings.compiler in [
+            "clang",
+            "apple-clang",
+        ]:
+            # The PCH timestamp would otherwise end up in every cache key
+            tc.extra_cxxflags.append("-Xclang -fno-pch-timestamp")
+
+        env = Environment()
+        if self.options.compiler_cache == "ccache":
+            env.define("CCACHE_BASEDIR", basedir)
+            env.define("CCACHE_NOHASHDIR", "1")
+            env.define("CCACHE_COMPILERCHECK", "content")
+            if self.options.precompiled_headers:
+                env.define(
+                    "CCACHE_SLOPPINESS",
+                    "pch_defines,time_macros,include_file_mtime,include_file_ctime",
+                )
+            if cachedir:
+                env.define("CCACHE_DIR", cachedir)
+        else:
+            env.define("SCCACHE_BASEDIRS", basedir)
+            if cachedir:
+                env.define("SCCACHE_DIR", cachedir)
+        env.vars(self, scope="build").save_script("conanbuild_compiler_cache")
 
-        deps = CMakeDeps(self)
-        deps.generate()
+    def _lto_flags(self):
+        """
+        Compile/link flags replacing CMake's IPO defaults, which only know one
+        flavour of LTO per compiler. Empty if CMake's defaults are used.
+        """
+        compiler = self.settings.compiler
+        flags = []
+        if compiler == "gcc":
+            # gcc has no ThinLTO, thin maps to the default partitioned (WHOPR) mode
+            # while full optimizes all of a library as one partition
+            flags.append(
+                "-flto=auto" if Version(compiler.version) >= "10" else "-flto"
+            )
+            if self.options.lto == "full":
+                flags.append("-flto-partition=one")
+            if not self.options.shared:
+                # Archives usable by both LTO and non-LTO consumers
+                flags.append("-ffat-lto-objects")
+        elif compiler in ["clang", "apple-clang"]:
+            flags.append(f"-flto={self.options.lto}")
+        return flags
+
+    def _profiling_flags(self):
+        """
+        Compile flags for option profiling: a frame pointer in every function,
+        leaf functions included, so stacks sampled by perf or eBPF resolve
+        through wx code without DWARF unwinding
+        """
+        if is_msvc(self):
+            return ["/Oy-"]
+        flags = ["-fno-omit-frame-pointer"]
+        if self.settings.arch in ["x86", "x86_64", "armv8"]:
+            flags.append("-mno-omit-leaf-frame-pointer")
+        if (
+            self.options.profiling == "frame_pointers_noinline"
+            and self.settings.compiler == "gcc"
+        ):
+            # Keeps functions called once as their own frames. clang has no
+            # equivalent and does not need one as often
+            flags.append("-fno-inline-functions-called-once")
+        return flags
 
-        ms = VirtualRunEnv(self)
-        ms.generate()
+    def _available_memory(self):
+        """
+        Bytes of memory available for the build, None if unknown
+        """
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    if line.startswith("MemAvailable:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @property
+    def _job_pools(self):
+        """
+        (compile, link) Ninja job pool sizes. Taken from conf
+        user.wxwidgets:compile_jobs/link_jobs, by default derived from the
+        number of jobs and the memory a compile or link job typically needs
+        """
+        jobs = build_jobs(self) or os.cpu_count() or 1
+        memory = self._available_memory()
+        gib = 1024**3
+        compile_mem = gib if self.settings.build_type == "Debug" else gib // 2
+        link_mem = 2 * gib
+        if self.options.lto != "off":
+            # The code generation happens at link time
+            compile_mem = gib // 2
+            link_mem = 6 * gib
+        compile_jobs = self.conf.get("user.wxwidgets:compile_jobs", check_type=int)
+        if not compile_jobs:
+            compile_jobs = jobs if memory is None else min(jobs, memory // compile_mem)
+        link_jobs = self.conf.get("user.wxwidgets:link_jobs", check_type=int)
+        if not link_jobs:
+            link_jobs = jobs if memory is None else min(jobs, memory // link_mem)
+        return max(int(compile_jobs), 1), max(int(link_jobs), 1)
+
+    def _configure_fingerprint(self):
+        """
+        Everything the results of wx's configure checks depend on: the
+        toolchain (compiler, flags from the profile, C library, gtk,
+        distribution) and the wx version. Options only count if they change
+        the probes, so the other configurations of a build matrix share a seed
+        """
+
+        def command_output(cmd):
+            out = StringIO()
+            self.run(cmd, stdout=out, stderr=out, quiet=True, ignore_errors=True)
+            return out.getvalue().strip()
+
+        executables = self.conf.get(
+            "tools.build:compiler_executables", default={}, check_type=dict
+        )
+        cc = executables.get("c") or os.environ.get("CC")
+        if not cc and self.settings.compiler in ["gcc", "clang", "apple-clang"]:
+            cc = "clang" if "clang" in str(self.settings.compiler) else "gcc"
+        fingerprint = {
+            "version": str(self.version),
+            "settings": {
+                k: str(v)
+                for k, v in self.settings.items()
+                if k in ["os", "arch", "compiler"] or k.startswith("compiler.")
+            },
+            # Toolkit probed and options adding flags or a linker the probes
+            # compile and link with
+            "options": {
+                name: str(self.options.get_safe(name))
+                for name in [
+                    "gtk",
+                    "linker",
+                    "lto",
+                    "pgo",
+                    "gc_sections",
+                    "profiling",
+                    "split_debug",
+                    "shared_link_profile",
+                ]
+            },
+            "flags": {
+                name: self.conf.get(f"tools.build:{name}", default=[], check_type=list)
+                for name in ["cflags", "cxxflags", "sharedlinkflags", "exelinkflags"]
+            },
+            "compiler": command_output(f'"{cc}" --version') if cc else "",
+        }
+        if self.settings.os == "Linux":
+            gtk = "gtk+-3.0" if self.options.gtk == "gtk3" else "gtk+-2.0"
+            fingerprint["libc"] = command_output("ldd --version").split("\n")[0]
+            fingerprint["gtk"] = command_output(f"pkg-config --modversion {gtk}")
+            if os.path.isfile("/etc/os-release"):
+                with open("/etc/os-release") as f:
+                    fingerprint["os_release"] = f.read()
+        return fingerprint
+
+    @property
+    def _configure_seed(self):
+        """
+        CMake cache file with the results of wx's configure checks for the
+        fingerprint from self.generate(), None if not enabled
+        """
+        cache_dir = self.conf.get("user.wxwidgets:configure_cache_dir")
+        fn = os.path.join(self.generators_folder, "configure_fingerprint.json")
+        if not cache_dir or not os.path.isfile(fn):
+            return None
+        with open(fn, "rb") as f:
+            key = hashlib.sha256(f.read()).hexdigest()[:16]
+        return os.path.join(cache_dir, f"wx-{self.version}-configure-{key}.cmake")
+
+    def _save_configure_seed(self, seed):
+        """
+        Used from self.build() to store the results of the configure checks
+        (INTERNAL HAVE_*, SIZEOF_* ... entries of CMakeCache.txt) for use with
+        cmake -C by later builds
+        """
+        re_probe = re.compile(
+            r"^((CMAKE_)?HAVE_\w+|wxHAVE_\w+|SIZEOF_\w+|wxHAS_\w+):INTERNAL=(.*)$"
+        )
+        lines = ["# Generated by conan recipe wxwidgets, configure check results"]
+        with open(os.path.join(self.build_folder, "CMakeCache.txt")) as f:
+            for line in f:
+                m = re_probe.match(line.rstrip("\n"))
+                if m:
+                    value = m.group(3)
+                    for char in ["\\", '"', "$"]:
+                        value = value.replace(char, "\\" + char)
+                    lines.append(f'set({m.group(1)} "{value}" CACHE INTERNAL "")')
+        # Written under a temporary name, parallel builds may read it
+        tmp = f"{seed}.tmp{os.getpid()}"
+        save(self, tmp, "\n".join(lines) + "\n")
+        os.replace(tmp, seed)
+        self.output.info(f"Saved {len(lines) - 1} configure check results to {seed}")
+
+    @property
+    def _build_types(self):
+        """
+        Configurations to build, settings.build_type unless option build_types is set
+        """
+        build_types = [
+            b.strip() for b in str(self.options.build_types).split(",") if b.strip()
+        ]
+        return build_types or [str(self.settings.build_type)]
+
+    @property
+    def _pgo_profile_dir(self):
+        return os.path.abspath(self.conf.get("user.wxwidgets:pgo_profile_dir"))
+
+    def _pgo_flags(self):
+        """
+        Compile/link flags for option pgo. gcc writes one .gcda per object below
+        the profile dir, named after the object path relative to the build folder
+        so the use build in another folder finds them. clang writes .profraw
+        files that self.build() merges into wx.profdata for the use build.
+        """
+        profile_dir = self._pgo_profile_dir
+        if self.settings.compiler == "gcc":
+            flags = [f"-fprofile-prefix-path={self.build_folder}"]
+            if self.options.pgo == "generate":
+                flags.append(f"-fprofile-generate={profile_dir}")
+                # The training workload may be multithreaded
+                flags.append("-fprofile-update=prefer-atomic")
+            else:
+                flags.append(f"-fprofile-use={profile_dir}")
+                # Functions the workload didn't run are optimized as usual
+                flags.append("-fprofile-partial-training")
+                flags.append("-Wno-missing-profile")
+            return flags
+        if self.options.pgo == "generate":
+            return [f"-fprofile-instr-generate={profile_dir}/wx-%p-%m.profraw"]
+        return [
+            f"-fprofile-instr-use={profile_dir}/wx.profdata",
+            "-Wno-profile-instr-unprofiled",
+            "-Wno-profile-instr-out-of-date",
+        ]
+
+    def _merge_pgo_profiles(self):
+        """
+        Used from self.build() to merge the .profraw files of a clang training
+        run into the wx.profdata used by pgo=use
+        """
+        profile_dir = self._pgo_profile_dir
+        profraw = glob.glob(os.path.join(profile_dir, "*.profraw"))
+        profdata = os.path.join(profile_dir, "wx.profdata")
+        if profraw:
+            llvm_profdata = self.conf.get(
+                "user.wxwidgets:llvm_profdata", default="llvm-profdata"
+            )
+            files = " ".join(f'"{fn}"' for fn in profraw)
+            self.run(f'{llvm_profdata} merge -output="{profdata}" {files}')
+        elif not os.path.isfile(profdata):
+            raise ConanException(
+                f"No wx.profdata or .profraw files in {profile_dir}, build with"
+                " pgo=generate and run a training workload first"
+            )
+
+    def _cmake_project_include(self):
+        """
+        Used from self.generate() to create CMake code that is run at the end of
+        wxWidgets' project() call, and when wxWidgets' top-level CMakeLists.txt
+        is done, i.e. when all wx targets are defined. Always sets the job pools.
+        """
+        compile_jobs, link_jobs = self._job_pools
+        self.output.info(f"Job pools: compile={compile_jobs} link={link_jobs}")
+        head = [
+            "set_property(GLOBAL APPEND PROPERTY JOB_POOLS"
+            f" compile={compile_jobs} link={link_jobs})"
+        ]
+        if self.options.lto != "off":
+            flags = ";".join(self._lto_flags())
+            if flags:
+                # Must come after project() where CMake sets its defaults
+                for lang in ["C", "CXX"]:
+                    head.append(f'set(CMAKE_{lang}_COMPILE_OPTIONS_IPO "{flags}")')
+                    head.append(f'set(CMAKE_{lang}_LINK_OPTIONS_IPO "{flags}")')
+        python = sys.executable
+        if getattr(sys, "frozen", False):
+            # Conan installer, sys.executable is conan itself
+            python = shutil.which("python3")
+        if os.name == "posix" and python:
+            # Peak RSS per job for build_stats.json, outside of try_compile()
+            script = os.path.join(self.generators_folder, "wxwidgets_job_rss.py")
+            save(self, script, _JOB_RSS_LAUNCHER)
+            launcher = '\\"%s\\" \\"%s\\" \\"%s\\"' % (
+                python,
+                script,
+                os.path.join(self.build_folder, "job_rss.log"),
+            )
+            for rule in ["RULE_LAUNCH_COMPILE", "RULE_LAUNCH_LINK"]:
+                head.append(f'set_property(GLOBAL PROPERTY {rule} "{launcher}")')
+
+        body = []
+        if self.options.unity_build:
+            exclusions = list(_UNITY_BUILD_EXCLUSIONS)
+            exclusions.extend(
+                self.conf.get(
+                    "user.wxwidgets:unity_build_exclusions", default=[], check_type=list
+                )
+            )
+            for item in exclusions:
+                target, _, source = item.partition(":")
+                body.append(f"  if(TARGET {target})")
+                if source:
+                    body.append(
+                        f'    set_source_files_properties("${{CMAKE_SOURCE_DIR}}/{source}"'
+                        f" TARGET_DIRECTORY {target} PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON)"
+                    )
+                else:
+                    body.append(
+                        f"    set_target_properties({target} PROPERTIES UNITY_BUILD OFF)"
+                    )
+                body.append("  endif()")
+
+        if self.conf.get("user.wxwidgets:check_headers", check_type=bool):
+            # One TU per public header, without PCH or unity batching to hide
+            # missing includes. Built on demand from self.build()
+            skip = ";".join(_HEADER_CHECK_SKIP)
+            core = "wxmono" if self.options.monolithic else "wxcore"
+            body.extend(
+                [
+                    f'  set(_skip "{skip}")',
+                    '  file(GLOB _headers RELATIVE "${CMAKE_SOURCE_DIR}/include"',
+                    '    "${CMAKE_SOURCE_DIR}/include/wx/*.h")',
+                    "  set(_sources)",
+                    "  foreach(_header ${_headers})",
+                    "    if(NOT _header IN_LIST _skip)",
+                    '      string(MAKE_C_IDENTIFIER "${_header}" _id)',
+                    '      set(_source "${CMAKE_BINARY_DIR}/header_check/${_id}.cpp")',
+                    '      file(CONFIGURE OUTPUT "${_source}" CONTENT "#include <${_header}>\\n")',
+                    '      list(APPEND _sources "${_source}")',
+                    "    endif()",
+                    "  endforeach()",
+                    "  add_library(wx_header_check OBJECT EXCLUDE_FROM_ALL ${_sources})",
+                    f"  target_link_libraries(wx_header_check PRIVATE {core})",
+                    "  set_target_properties(wx_header_check PROPERTIES",
+                    "    UNITY_BUILD OFF DISABLE_PRECOMPILE_HEADERS ON)",
+                ]
+            )
+
+        lines = ["# Generated by conan recipe wxwidgets"]
+        lines.extend(head)
+        if body:
+            lines.append("function(_wx_conan_project_end)")
+            lines.extend(body)
+            lines.append("endfunction()")
+            lines.append(
+                'cmake_language(DEFER DIRECTORY "${CMAKE_SOURCE_DIR}" CALL _wx_conan_project_end)'
+            )
+        return "\n".join(lines) + "\n"
+
+    def _compiler_cache_counters(self):
+        """
+        Return (hits, misses) as reported by the compiler cache or None if unavailable
+        """
+        program = self._compiler_cache_program
+        out = StringIO()
+        if self.options.compiler_cache == "ccache":
+            self.run(
+                f"{program} --print-stats", stdout=out, quiet=True, ignore_errors=True
+            )
+            stats = {}
+            for line in out.getvalue().splitlines():
+                key, _, value = line.partition("\t")
+                if value.strip().isdigit():
+                    stats[key.strip()] = int(value)
+            if "cache_miss" not in stats:
+                return None
+            hits = stats.get("direct_cache_hit", 0)
+            hits += stats.get("preprocessed_cache_hit", 0)
+            return hits, stats["cache_miss"]
+
+        self.run(
+            f"{program} --show-stats --stats-format=json",
+            stdout=out,
+            quiet=True,
+            ignore_errors=True,
+        )
+        try:
+            stats = json.loads(out.getvalue())["stats"]
+        except (ValueError, KeyError):
+            return None
+
+        def count(name):
+            return sum(stats.get(name, {}).get("counts", {}).values())
+
+        return count("cache_hits"), count("cache_misses")
+
+    def _save_compiler_cache_stats(self, before):
+        """
+        Used from self.build() to report hits/misses of this build only
+        """
+        after = self._compiler_cache_counters()
+        if before is None or after is None:
+            self.output.warning("Could not read compiler cache statistics")
+            return
+        hits = after[0] - before[0]
+        misses = after[1] - before[1]
+        total = hits + misses
+        stats = {
+            "program": str(self.options.compiler_cache),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+        self.output.info(
+            "Compiler cache: %d hits, %d misses (%.1f%%)"
+            % (hits, misses, 100.0 * stats["hit_rate"])
+        )
+        fn = os.path.join(self.build_folder, "compiler_cache_stats.json")
+        with open(fn, "w") as f:
+            json.dump(stats, f, indent=2)
+
+    def _save_build_stats(self):
+        """
+        Used from self.build() to summarize .ninja_log (and clang -ftime-trace files)
+        into build_stats.json, packaged as pkg/build_stats.json. Peak RSS per
+        compile and link job comes from the job launcher, see _job_peak_rss()
+        """
+        log = os.path.join(self.build_folder, ".ninja_log")
+        if not os.path.isfile(log):
+            self.output.warning("No .ninja_log found, skipping build statistics")
+            return
+
+        steps = {}
+        with open(log) as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if line.startswith("#") or len(parts) < 4:
+                    continue
+                # Later entries are rebuilds of the same output
+                steps[parts[3]] = (int(parts[0]), int(parts[1]))
+        if not steps:
+            return
+
+        rss = self._job_peak_rss(steps)
+        re_target = re.compile(r"CMakeFiles/([^/]+)\.dir/(.*)$")
+        re_link = re.compile(r"\.(a|lib|so[\d.]*|dll|dylib|exe)$|(^|/)wxrc[^/.]*$")
+        targets = {}
+        libraries = {}
+        units = []
+        links = []
+
+        def add(table, key, field, seconds):
+            entry = table.setdefault(key, {"compile_s": 0.0, "link_s": 0.0, "steps": 0})
+            entry[field] = round(entry[field] + seconds, 3)
+            entry["steps"] += 1
+
+        for output, (start, end) in steps.items():
+            seconds = (end - start) / 1000.0
+            m = re_target.search(output)
+            if m:
+                target = m.group(1)
+                # CMake maps sources outside the target dir to __/__/...
+                source = re.sub(r"^(__/)+|\.(o|obj)$", "", m.group(2))
+                if target.startswith("wx") and (
+                    target[2:] in _WX_LIBRARIES or target == "wxmono"
+                ):
+                    library = target[2:]
+                else:
+                    library = target
+                add(targets, target, "compile_s", seconds)
+                add(libraries, library, "compile_s", seconds)
+                unit = {"source": source, "target": target, "seconds": seconds}
+                if output in rss:
+                    unit["peak_rss_kib"] = rss[output]
+                trace = os.path.join(
+                    self.build_folder, os.path.splitext(output)[0] + ".json"
+                )
+                if os.path.isfile(trace):
+                    unit.update(self._parse_time_trace(trace))
+                units.append(unit)
+            elif re_link.search(output):
+                library = _WxLibFromFilename(output)
+                if library in _WX_LIBRARIES or library == "mono":
+                    add(targets, "wx" + library, "link_s", seconds)
+                else:
+                    add(targets, library, "link_s", seconds)
+                add(libraries, library, "link_s", seconds)
+                link = {"output": output, "library": library, "seconds": seconds}
+                if output in rss:
+                    link["peak_rss_kib"] = rss[output]
+                links.append(link)
+
+        first = min(start for start, end in steps.values())
+        last = max(end for start, end in steps.values())
+        stats = {
+            "wall_time_s": (last - first) / 1000.0,
+            "targets": targets,
+            "libraries": libraries,
+            "slowest_units": sorted(units, key=lambda u: -u["seconds"])[:50],
+            "links": sorted(links, key=lambda u: -u["seconds"]),
+        }
+        if rss:
+            largest = max(rss, key=rss.get)
+            stats["largest_job"] = {"output": largest, "peak_rss_kib": rss[largest]}
+
+        fn = os.path.join(self.build_folder, "build_stats.json")
+        with open(fn, "w") as f:
+            json.dump(stats, f, indent=2)
+
+        slowest = sorted(libraries.items(), key=lambda i: -i[1]["compile_s"])[:5]
+        self.output.info(
+            "Build took %.1fs, most compile time: %s"
+            % (
+                stats["wall_time_s"],
+                ", ".join("%s %.0fs" % (n, e["compile_s"]) for n, e in slowest),
+            )
+        )
+        self.output.info(
+            "Link steps (linker: %s), %.1fs in total:"
+            % (
+                self.options.get_safe("linker", "default"),
+                sum(link["seconds"] for link in links),
+            )
+        )
+        for link in [link for link in stats["links"] if link["seconds"] > 0]:
+            self.output.info(
+                "  %-50s %7.2fs" % (os.path.basename(link["output"]), link["seconds"])
+            )
+
+    def _job_peak_rss(self, steps):
+        """
+        Read the peak RSS in KiB per ninja output (keys of steps) from the log
+        of the job launcher set up by self._cmake_project_include()
+        """
+        log = os.path.join(self.build_folder, "job_rss.log")
+        rss = {}
+        if not os.path.isfile(log):
+            return rss
+        with open(log) as f:
+            for line in f:
+                fields = line.rstrip("\n").split("\t")
+                if not fields[0].isdigit():
+                    continue
+                # The command line names the output as ninja does, relative
+                # to the build folder: after -o, else the first one (ar,
+                # ranlib). Archives take several commands
+                args = fields[1:]
+                if "-o" in args[:-1]:
+                    args = [args[args.index("-o") + 1]]
+                for arg in args:
+                    if arg in steps:
+                        rss[arg] = max(rss.get(arg, 0), int(fields[0]))
+                        break
+        return rss
+
+    def _parse_time_trace(self, fn):
+        """
+        Read frontend/backend seconds from a clang -ftime-trace file
+        """
+        result = {}
+        try:
+            with open(fn) as f:
+                events = json.load(f).get("traceEvents", [])
+        except (OSError, ValueError):
+            return result
+        for event in events:
+            if event.get("name") == "Total Frontend":
+                result["frontend_s"] = event.get("dur", 0) / 1e6
+            elif event.get("name") == "Total Backend":
+                result["backend_s"] = event.get("dur", 0) / 1e6
+        return result
+
+    def _check_linker(self):
+        """
+        Used from self.build() to fail early if the linker of option linker is
+        missing from the build environment (PATH and tool_requires)
+        """
+        linker = self.options.get_safe("linker", "default")
+        if linker == "default":
+            return
+        exe = {"lld": "ld.lld", "mold": "mold", "gold": "ld.gold"}[str(linker)]
+        if self.settings.os == "Macos":
+            exe = "ld64.lld"
+        with VirtualBuildEnv(self).vars().apply():
+            found = shutil.which(exe)
+        if not found:
+            raise ConanException(
+                f"linker={linker} requested but {exe} was not found in the build environment"
+            )
 
     def build(self):
+        self._check_linker()
+        cache_before = None
+        if self.options.compiler_cache != "off":
+            if self.options.compiler_cache == "sccache":
+                # sccache counts per server, start from zero
+                self.run(
+                    f"{self._compiler_cache_program} --zero-stats",
+                    quiet=True,
+                    ignore_errors=True,
+                )
+            cache_before = self._compiler_cache_counters()
+
+        if self.options.get_safe("pgo") == "use":
+            if self.settings.compiler == "gcc":
+                if not glob.glob(
+                    os.path.join(self._pgo_profile_dir, "**", "*.gcda"), recursive=True
+                ):
+                    self.output.warning(f"No .gcda profiles in {self._pgo_profile_dir}")
+            else:
+                self._merge_pgo_profiles()
+
         cmake = CMake(self)
-        cmake.configure()
-        cmake.build()
+        seed = self._configure_seed
+        if seed and os.path.isfile(seed):
+            self.output.info(f"Using configure check results from {seed}")
+            try:
+                cmake.configure(cli_args=["-C", seed])
+            except ConanException:
+                self.output.warning("Configure failed with cached check results, retrying")
+                cache = os.path.join(self.build_folder, "CMakeCache.txt")
+                if os.path.isfile(cache):
+                    os.remove(cache)
+                cmake.configure()
+                self._save_configure_seed(seed)
+        else:
+            cmake.configure()
+            if seed:
+                self._save_configure_seed(seed)
+        job_rss_log = os.path.join(self.build_folder, "job_rss.log")
+        if os.path.isfile(job_rss_log):
+            # Jobs of earlier builds in this folder
+            os.remove(job_rss_log)
+        if str(self.options.build_types):
+            for build_type in self._build_types:
+                cmake.build(build_type=build_type)
+        else:
+            cmake.build()
+        self._save_build_stats()
+        if self.conf.get("user.wxwidgets:check_headers", check_type=bool):
+            # Headers must still compile on their own with PCH and unity builds
+            cmake.build(target="wx_header_check")
+
+        if self.options.compiler_cache != "off":
+            self._save_compiler_cache_stats(cache_before)
 
     def package(self):
         copy(
@@ -497,7 +1873,11 @@ class wxwidgetsRecipe(ConanFile):
         )
         # self.copy(pattern="LICENSE", dst="licenses", src=self._source_subfolder)
         cmake = CMake(self)
-        cmake.install()
+        if str(self.options.build_types):
+            for build_type in self._build_types:
+                cmake.install(build_type=build_type)
+        else:
+            cmake.install()
 
         comps = self._parse_cmake_targets(modify=True)
         # for comp in comps.values():
@@ -508,8 +1888,194 @@ class wxwidgetsRecipe(ConanFile):
 
         # Will also save comps data to package
         self._adjust_package(comps)
+        self._save_pch_headers(comps)
+        if self.options.get_safe("split_debug"):
+            self._split_debug_info()
+        if not self.options.wxrc:
+            for fn in glob.glob(os.path.join(self.package_folder, "bin", "wxrc*")):
+                os.remove(fn)
+        if self.options.slim_package:
+            self._slim_package(comps)
+        self._record_sizes(comps)
+        self._save_package_info(comps)
+        for fn in ["compiler_cache_stats.json", "build_stats.json"]:
+            copy(
+                self,
+                fn,
+                src=self.build_folder,
+                dst=os.path.join(self.package_folder, "pkg"),
+            )
         return
 
+    def _save_pch_headers(self, comps):
+        """
+        Used from self.package() to write res/pch/wx_pch_<comp>.h for every
+        component with headers in _PCH_HEADERS, wx_pch.h with all of them and
+        the CMake module used by the wx::pch component
+        """
+        folder = os.path.join(self.package_folder, "res", "pch")
+        includedirs = {d for comp in comps.values() for d in comp["includedirs"]}
+
+        def available(header):
+            return any(
+                os.path.isfile(os.path.join(self.package_folder, d, header))
+                for d in includedirs
+            )
+
+        names = [name for name in _PCH_HEADERS if name in comps]
+        for name in names:
+            lines = ["// Generated by conan recipe wxwidgets", "#pragma once"]
+            lines.extend(
+                f'#include "wx_pch_{dep}.h"'
+                for dep in _WX_LIBRARIES.get(name, (None, []))[1]
+                if dep in names
+            )
+            lines.extend(f"#include <{h}>" for h in _PCH_HEADERS[name] if available(h))
+            save(self, os.path.join(folder, f"wx_pch_{name}.h"), "\n".join(lines) + "\n")
+        lines = ["// Generated by conan recipe wxwidgets", "#pragma once"]
+        lines.extend(f'#include "wx_pch_{name}.h"' for name in names)
+        save(self, os.path.join(folder, "wx_pch.h"), "\n".join(lines) + "\n")
+        save(
+            self,
+            os.path.join(self.package_folder, "res", "cmake", "wxWidgetsPCH.cmake"),
+            _PCH_CMAKE_MODULE,
+        )
+
+    def _header_files(self, library):
+        """
+        Header files of a wx library (see _LIBRARY_HEADERS) in the package
+        """
+        files = []
+        for incdir in glob.glob(os.path.join(self.package_folder, "include", "wx-*")):
+            for pattern in _LIBRARY_HEADERS.get(library, []):
+                path = os.path.join(incdir, pattern)
+                if pattern.endswith("/"):
+                    for root, _, names in os.walk(path):
+                        files.extend(os.path.join(root, n) for n in names)
+                elif os.path.isfile(path):
+                    files.append(path)
+        return files
+
+    def _slim_package(self, comps):
+        """
+        Used from self.package() to reduce the package size: removes headers of
+        wx libraries that were not built and strips the binaries of release
+        builds, only of debug info with option profiling
+        """
+        removed = 0
+        for library in _LIBRARY_HEADERS:
+            if library not in comps:
+                for fn in self._header_files(library):
+                    os.remove(fn)
+                    removed += 1
+        for incdir in glob.glob(os.path.join(self.package_folder, "include", "wx-*")):
+            for root, dirs, files in os.walk(incdir, topdown=False):
+                if not dirs and not files:
+                    os.rmdir(root)
+        self.output.info(f"Removed {removed} headers of wx libraries not built")
+
+        if is_msvc(self) or any(
+            b not in ["Release", "MinSizeRel"] for b in self._build_types
+        ):
+            return
+        strip = self.conf.get("user.wxwidgets:strip", default="strip")
+        if self.settings.os == "Macos":
+            shared_args, static_args = "-x", "-S"
+        else:
+            shared_args, static_args = "--strip-unneeded", "--strip-debug"
+        if self.options.profiling != "off":
+            # Profilers symbolize with the symbol table, local symbols included
+            shared_args = static_args
+        binaries = glob.glob(os.path.join(self.package_folder, "bin", "*"))
+        binaries.extend(glob.glob(os.path.join(self.package_folder, "lib", "*")))
+        for fn in binaries:
+            if os.path.islink(fn) or not os.path.isfile(fn):
+                continue
+            with open(fn, "rb") as f:
+                magic = f.read(8)
+            if magic.startswith(b"!<arch>"):
+                if self.options.lto != "off":
+                    # Bitcode (clang) or LTO sections (gcc) GNU strip can't handle
+                    continue
+                self.run(f'{strip} {static_args} "{fn}"')
+            elif magic[:4] in [b"\x7fELF", b"\xcf\xfa\xed\xfe", b"\xca\xfe\xba\xbe"]:
+                # ELF, 64 bit and universal Mach-O. Not wx-config & co
+                self.run(f'{strip} {shared_args} "{fn}"')
+
+    def _record_sizes(self, comps):
+        """
+        Used from self.package() to store the bytes of libraries and headers per
+        component as comp["size_bytes"]. Headers not belonging to a library in
+        _LIBRARY_HEADERS are counted for base.
+        """
+        for comp in comps.values():
+            comp["size_bytes"] = {"libs": 0, "headers": 0}
+
+        for folder in ["lib", "bin"]:
+            for fn in glob.glob(os.path.join(self.package_folder, folder, "*")):
+                if os.path.islink(fn) or not os.path.isfile(fn):
+                    continue
+                library = _WxLibFromFilename(fn)
+                if library in comps:
+                    comps[library]["size_bytes"]["libs"] += os.path.getsize(fn)
+
+        claimed = set()
+        for library in _LIBRARY_HEADERS:
+            files = self._header_files(library)
+            claimed.update(files)
+            if library in comps:
+                comps[library]["size_bytes"]["headers"] = sum(
+                    os.path.getsize(fn) for fn in files
+                )
+        if "base" in comps:
+            for folder in ["include", "lib"]:
+                for root, _, files in os.walk(os.path.join(self.package_folder, folder)):
+                    for fn in (os.path.join(root, n) for n in files):
+                        if fn.endswith(".h") and fn not in claimed:
+                            comps["base"]["size_bytes"]["headers"] += os.path.getsize(fn)
+
+    def _split_debug_info(self):
+        """
+        Used from self.package() to move debug info out of the package and into
+        the package metadata, which is only downloaded on demand, e.g:
+            conan download wxwidgets/<version>:<package_id> --metadata="debug/*"
+        Shared libraries and wxrc are stripped and get a .gnu_debuglink to
+        <name>.debug (+ <name>.dwp with the split DWARF). Static libraries keep
+        their skeleton debug info and the .dwo files are stored as is.
+        """
+        objcopy = self.conf.get("user.wxwidgets:objcopy", default="objcopy")
+        dwp = self.conf.get("user.wxwidgets:dwp", default="dwp")
+        debugdir = os.path.join(self.package_metadata_folder, "debug")
+        os.makedirs(debugdir, exist_ok=True)
+
+        if not self.options.shared:
+            count = 0
+            for root, dirs, files in os.walk(self.build_folder):
+                for file in files:
+                    if file.endswith(".dwo"):
+                        src = os.path.join(root, file)
+                        rel = os.path.relpath(src, self.build_folder)
+                        dst = os.path.join(debugdir, "dwo", rel)
+                        os.makedirs(os.path.dirname(dst), exist_ok=True)
+                        shutil.copy2(src, dst)
+                        count += 1
+            self.output.info(f"Moved {count} .dwo files to package metadata")
+            return
+
+        binaries = [os.path.join(self.package_folder, "bin", "wxrc")]
+        binaries.extend(glob.glob(os.path.join(self.package_folder, "lib", "*.so*")))
+        have_dwp = shutil.which(dwp) is not None
+        if not have_dwp:
+            self.output.warning(f"{dwp} not found, .dwo files are not packaged")
+        for fn in binaries:
+            if os.path.islink(fn) or not os.path.isfile(fn):
+                continue
+            base = os.path.join(debugdir, os.path.basename(fn))
+            if have_dwp:
+                self.run(f'{dwp} -e "{fn}" -o "{base}.dwp"')
+            self.run(f'{objcopy} --only-keep-debug "{fn}" "{base}.debug"')
+            self.run(f'{objcopy} --strip-debug --add-gnu-debuglink="{base}.debug" "{fn}"')
+
     def package_info(self):
         comps = self._load_package_info()
         if "base" not in comps:
@@ -520,16 +2086,64 @@ class wxwidgetsRecipe(ConanFile):
         # for comp in comps.values():
         #    self.output.debug(_CompStr(comp, self.settings.os))
 
+        # Lets consumers enable whole-program optimization across wx
+        self.cpp_info.set_property("wx_lto", str(self.options.lto))
+        linkflags = []
+        if (
+            self.options.lto != "off"
+            and not self.options.shared
+            and self.settings.compiler in ["clang", "apple-clang"]
+        ):
+            # Archives hold bitcode only, the final link must run LTO
+            linkflags.append(f"-flto={self.options.lto}")
+        gc_sections = self.options.get_safe("gc_sections", "off")
+        if gc_sections != "off":
+            linkflags.append(
+                "-Wl,-dead_strip" if self.settings.os == "Macos" else "-Wl,--gc-sections"
+            )
+            if gc_sections == "icf":
+                linkflags.append("-Wl,--icf=all")
+        if self.options.get_safe("pgo") == "generate" and not self.options.shared:
+            # Instrumented archives need the profile runtime
+            linkflags.append(
+                "-fprofile-generate"
+                if self.settings.compiler == "gcc"
+                else "-fprofile-instr-generate"
+            )
+
+        defines = []
+        if self.options.preset != "development":
+            # Inline code of consumers must see the same debug level and logging
+            defines = [f"{name}={value}" for name, value in _PRESET_DEFINES.items()]
+
         for comp in comps.values():
             info = self.cpp_info.components[comp["name"]]
             info.set_property("cmake_file_name", comp["name"].capitalize())
             info.set_property("cmake_target_name", comp["target"])
-            info.libs = [comp["libname"]]
-            info.libdirs = ["lib"]
-            info.defines = comp["defines"]
-            info.includedirs = comp["includedirs"]
+            # Option build_types: library and setup.h of the consumer's build_type
+            config = comp.get("configs", {}).get(str(self.settings.build_type), comp)
+            # Aliases of the monolithic library carry no library of their own
+            info.libs = [config["libname"]] if config["libname"] else []
+            info.libdirs = ["lib"] if config["libname"] else []
+            info.defines = comp["defines"] + [
+                d for d in defines if d not in comp["defines"]
+            ]
+            info.includedirs = config.get("includedirs", comp["includedirs"])
             info.requires = comp["requires"]
             info.system_libs = comp["system_libs"]
+            info.exelinkflags = linkflags
+            info.sharedlinkflags = linkflags
+
+        # Precompiled headers for consumers, see _save_pch_headers()
+        pch = self.cpp_info.components["pch"]
+        pch.set_property("cmake_target_name", "wx::pch")
+        pch.libs = []
+        pch.libdirs = []
+        pch.includedirs = ["res/pch"]
+        pch.requires = [comp["name"] for comp in comps.values()]
+        self.cpp_info.set_property(
+            "cmake_build_modules", [os.path.join("res", "cmake", "wxWidgetsPCH.cmake")]
+        )
         return
 
     def _load_package_info(self):
@@ -554,6 +2168,47 @@ class wxwidgetsRecipe(ConanFile):
         with open(fn, "w") as f:
             json.dump(comps, f, indent=2)
 
+    def _elf_link_stats(self, fn):
+        """
+        Exported symbols, dynamic relocations and DT_NEEDED of a shared library,
+        as reported by readelf. None if readelf is not available.
+        """
+        readelf = self.conf.get("user.wxwidgets:readelf", default="readelf")
+        if not shutil.which(readelf):
+            return None
+
+        def run(args):
+            out = StringIO()
+            self.run(f'{readelf} {args} "{fn}"', stdout=out, quiet=True)
+            return out.getvalue().splitlines()
+
+        needed = []
+        for line in run("-dW"):
+            m = re.search(r"\(NEEDED\).*\[(.+)\]", line)
+            if m:
+                needed.append(m.group(1))
+        exported = 0
+        for line in run("--dyn-syms -W"):
+            # Num: Value Size Type Bind Vis Ndx Name
+            parts = line.split()
+            if (
+                len(parts) >= 8
+                and parts[4] in ["GLOBAL", "WEAK"]
+                and parts[5] in ["DEFAULT", "PROTECTED"]
+                and parts[6] != "UND"
+            ):
+                exported += 1
+        relocations = 0
+        for line in run("-rW"):
+            m = re.match(r"Relocation section .* contains (\d+) entr", line)
+            if m:
+                relocations += int(m.group(1))
+        return {
+            "exported_symbols": exported,
+            "relocations": relocations,
+            "needed": needed,
+        }
+
     def _parse_syslib(self, lib):
         if self.settings.os != "Linux":
             return lib
@@ -578,26 +2233,27 @@ class wxwidgetsRecipe(ConanFile):
           * link libraries
         """
 
-        targetsBuildFileFN = (
-            "wxWidgetsTargets-" + str(self.settings.build_type).lower() + ".cmake"
-        )
+        # One wxWidgetsTargets-<config>.cmake per configuration (option build_types)
+        targetsBuildFileFNs = {
+            b: "wxWidgetsTargets-" + b.lower() + ".cmake" for b in self._build_types
+        }
         targetsFileFN = "wxWidgetsTargets.cmake"
-        targetsBuildFile = None
+        targetsBuildFiles = {}
         targetsFile = None
 
         for root, dirs, files in os.walk(
             os.path.join(self.package_folder, "lib", "cmake", "wxWidgets")
         ):
             for file in files:
-                if not targetsBuildFile and file == targetsBuildFileFN:
-                    targetsBuildFile = os.path.join(root, file)
-                elif not targetsFile and file == targetsFileFN:
+                for build_type, fn in targetsBuildFileFNs.items():
+                    if build_type not in targetsBuildFiles and file == fn:
+                        targetsBuildFiles[build_type] = os.path.join(root, file)
+                if not targetsFile and file == targetsFileFN:
                     targetsFile = os.path.join(root, file)
-                if targetsFile and targetsBuildFile:
-                    break
-        if not targetsFile or not targetsBuildFile:
+        if not targetsFile or len(targetsBuildFiles) != len(targetsBuildFileFNs):
             raise ParseCMakeError(
-                f"Could not find files: {targetsBuildFileFN} or {targetsFileFN}"
+                "Could not find files: %s or %s"
+                % (", ".join(targetsBuildFileFNs.values()), targetsFileFN)
             )
 
         # We only support what we have seen in real wx cmake-file
@@ -609,55 +2265,71 @@ class wxwidgetsRecipe(ConanFile):
                 raise ParseCMakeError
             return name[6:]
 
-        self.output.info(f"Parsing {targetsBuildFile}...")
-        with open(targetsBuildFile) as f:
+        def parse_build_file(targetsBuildFile):
             """
             Parse blocks like these
             set_target_properties(wx::wxcore PROPERTIES
               IMPORTED_IMPLIB_RELEASE "${_IMPORT_PREFIX}/lib/vc_x64_dll/wxmsw32u_core.lib"
               IMPORTED_LOCATION_RELEASE "${_IMPORT_PREFIX}/lib/vc_x64_dll/wxmsw32u_core_vc_custom.dll"
               )
+            into {compname: {"src_libloc": ..., "src_implib": ..., "src_soname": ...}}
             """
-
-            comp = None
-            for line in f:
-                line = line.strip()
-
-                if comp:
-                    if line == ")":
-                        comp = None
-                    ## Ignore
-                    # elif line.startswith('IMPORTED_LINK_INTERFACE_LANGUAGES'):
-                    #    lang = line.split(' ', 1)[1].split(';')
-                    #    comp['link_languages'].extend(lang)
-                    elif line.startswith("IMPORTED_LOCATION"):
-                        relpath = (
-                            line.split(" ", 1)[1]
-                            .strip('"')
-                            .replace("${_IMPORT_PREFIX}/", "")
-                        )
-                        comp["src_libloc"] = relpath
-                    elif line.startswith("IMPORTED_IMPLIB"):
-                        relpath = (
-                            line.split(" ", 1)[1]
-                            .strip('"')
-                            .replace("${_IMPORT_PREFIX}/", "")
+            self.output.info(f"Parsing {targetsBuildFile}...")
+            entries = {}
+            with open(targetsBuildFile) as f:
+                entry = None
+                for line in f:
+                    line = line.strip()
+
+                    if entry is not None:
+                        if line == ")":
+                            entry = None
+                        ## Ignore
+                        # elif line.startswith('IMPORTED_LINK_INTERFACE_LANGUAGES'):
+                        #    lang = line.split(' ', 1)[1].split(';')
+                        #    comp['link_languages'].extend(lang)
+                        elif line.startswith("IMPORTED_LOCATION"):
+                            relpath = (
+                                line.split(" ", 1)[1]
+                                .strip('"')
+                                .replace("${_IMPORT_PREFIX}/", "")
+                            )
+                            entry["src_libloc"] = relpath
+                        elif line.startswith("IMPORTED_IMPLIB"):
+                            relpath = (
+                                line.split(" ", 1)[1]
+                                .strip('"')
+                                .replace("${_IMPORT_PREFIX}/", "")
+                            )
+                            entry["src_implib"] = relpath
+                        elif line.startswith("IMPORTED_SONAME"):
+                            # Strip any leading @rpath/
+                            basename = os.path.basename(line.split(" ", 1)[1].strip('"'))
+                            entry["src_soname"] = basename
+                        continue
+
+                    m = re_prop.match(line)
+                    if m:
+                        compname = parse_wxtarget(m.group(1))
+                        if compname in entries:
+                            raise ParseCMakeError(f"Component {compname} already parsed")
+                        entry = {"src_libloc": "", "src_implib": "", "src_soname": ""}
+                        entries[compname] = entry
+            return entries
+
+        parsed = {b: parse_build_file(fn) for b, fn in targetsBuildFiles.items()}
+        for compname, entry in parsed[str(self.settings.build_type)].items():
+            comp = _CreateComp(compname, "wx::" + compname)
+            comp.update(entry)
+            comps[compname] = comp
+        if str(self.options.build_types):
+            for build_type, entries in parsed.items():
+                for compname, entry in entries.items():
+                    if compname not in comps:
+                        raise ParseCMakeError(
+                            f"Component {compname} only built for {build_type}"
                         )
-                        comp["src_implib"] = relpath
-                    elif line.startswith("IMPORTED_SONAME"):
-                        # Strip any leading @rpath/
-                        basename = os.path.basename(line.split(" ", 1)[1].strip('"'))
-                        comp["src_soname"] = basename
-                    continue
-
-                m = re_prop.match(line)
-                if m:
-                    compname = parse_wxtarget(m.group(1))
-                    target = "wx::" + compname
-                    if compname in comps:
-                        raise ParseCMakeError(f"Component {compname} already parsed")
-                    comp = _CreateComp(compname, target)
-                    comps[compname] = comp
+                    comps[compname].setdefault("configs", {})[build_type] = entry
 
         self.output.info(f"Parsing {targetsFile}...")
         with open(targetsFile) as f:
@@ -688,11 +2360,16 @@ class wxwidgetsRecipe(ConanFile):
                             .strip('"')
                             .replace("${_IMPORT_PREFIX}/", "")
                         )
-                        defs = defs.replace(
-                            r"\$<\$<CONFIG:Debug>:d>",
-                            "d" if self.settings.build_type == "Debug" else "",
-                        )
-                        comp["includedirs"] = [d.strip() for d in defs.split(";")]
+                        def includedirs(build_type):
+                            dirs = defs.replace(
+                                r"\$<\$<CONFIG:Debug>:d>",
+                                "d" if build_type == "Debug" else "",
+                            )
+                            return [d.strip() for d in dirs.split(";")]
+
+                        comp["includedirs"] = includedirs(self.settings.build_type)
+                        for build_type, entry in comp.get("configs", {}).items():
+                            entry["includedirs"] = includedirs(build_type)
                     elif line.startswith("INTERFACE_LINK_LIBRARIES"):
                         defs = line[25:].strip().strip('"')
                         for d in defs.split(";"):
@@ -731,8 +2408,108 @@ class wxwidgetsRecipe(ConanFile):
                         raise ParseCMakeError(f"Component {compname} not defined")
                     comp = comps[compname]
 
+        if "mono" in comps:
+            self._add_mono_aliases(comps)
         return comps
 
+    def _add_mono_aliases(self, comps):
+        """
+        A monolithic build has a single wx::wxmono target (and possibly a separate gl).
+        Add the usual per-library components as aliases requiring mono so that
+        consumers can keep using wx::core, wx::base etc.
+        """
+        libraries = self._library_options(self.options)
+        for name, (option, _) in _WX_LIBRARIES.items():
+            if name in comps:
+                continue
+            if option and not libraries.get(option):
+                continue
+            comp = _CreateComp(name, "wx::" + name)
+            comp["requires"].append("mono")
+            comp["alias"] = "mono"
+            comps[name] = comp
+
+    def _move_library(self, libloc, implib):
+        """
+        Used from self._adjust_package() to move a library (runtime at libloc,
+        import library implib) to its final place. Returns the library name
+        """
+        libname = None
+        ## TODO: Make sure soname links to library
+        # soname = comp['src_soname']
+        if libloc:
+            ext = ""
+            destdir = "lib"
+            base = os.path.basename(libloc).lower()
+            if self.settings.os == "Windows":
+                if self.options.shared:
+                    destdir = "bin"
+                ext = ".dll" if self.options.shared else ".lib"
+            elif self.settings.os == "Linux":
+                ext = ".so" if self.options.shared else ".a"
+            elif self.settings.os == "Macos":
+                ext = ".dylib" if self.options.shared else ".a"
+            if not base.endswith(ext):
+                if self.options.shared and self.settings.os == "Linux":
+                    # Get rid of the garbage after '.so'
+                    if ext not in base:
+                        raise ConanException(
+                            f"Invalid lib (expected *{ext}*): " + libloc
+                        )
+                    base = base[: base.index(ext)] + ext
+                else:
+                    raise ConanException(
+                        f"Invalid lib (expected *{ext}): " + libloc
+                    )
+            if not libname:
+                libname = base[: -len(ext)]
+            dst = os.path.join(destdir, libname + ext)
+
+            if self.settings.os == "Windows":
+                if dst != libloc:
+                    # self.output.verbose("Moving %s -> %s" %(libloc, dst))
+                    rename(
+                        self,
+                        os.path.join(self.package_folder, libloc),
+                        os.path.join(self.package_folder, dst),
+                    )
+
+        if implib:
+            base = os.path.basename(implib.lower())
+            if self.settings.os == "Windows":
+                ext = ".lib"
+                if not base.endswith(ext):
+                    raise ConanException(
+                        f"Invalid implib (expected *{ext}): " + implib
+                    )
+                if not libname:
+                    raise ConanException(
+                        f"Missing DLL for implib {base}: " + implib
+                    )
+            else:
+                raise ConanException(
+                    "Invalid implib (not expected for OS): " + implib
+                )
+            dst = os.path.join("lib", libname + ext)
+            if dst != implib:
+                # self.output.verbose("Moving %s -> %s" %(implib, dst))
+                rename(
+                    self,
+                    os.path.join(self.package_folder, implib),
+                    os.path.join(self.package_folder, dst),
+                )
+
+        if libname:
+            if self.settings.os != "Windows":
+                # Tested with Linux. Assume same with Macos
+                if not libname.startswith("lib"):
+                    raise ConanException(
+                        "Invalid wxWidgets library, not starting with 'lib': "
+                        + implib
+                    )
+                libname = libname[3:]
+        return libname or ""
+
     def _adjust_package(self, comps):
         """
         Try to clean up wxWidgets coherency here and prepare data for package_info()
@@ -771,97 +2548,50 @@ class wxwidgetsRecipe(ConanFile):
                 self.output.warning(f"No wxrc{exe} found")
 
         for comp in comps.values():
-            libname = None
             libloc = comp["src_libloc"]
-            implib = comp["src_implib"]
-            ## TODO: Make sure soname links to library
-            # soname = comp['src_soname']
-            if libloc:
-                ext = ""
-                destdir = "lib"
-                base = os.path.basename(libloc).lower()
-                if self.settings.os == "Windows":
-                    if self.options.shared:
-                        destdir = "bin"
-                    ext = ".dll" if self.options.shared else ".lib"
-                elif self.settings.os == "Linux":
-                    ext = ".so" if self.options.shared else ".a"
-                elif self.settings.os == "Macos":
-                    ext = ".dylib" if self.options.shared else ".a"
-                if not base.endswith(ext):
-                    if self.options.shared and self.settings.os == "Linux":
-                        # Get rid of the garbage after '.so'
-                        if ext not in base:
-                            raise ConanException(
-                                f"Invalid lib (expected *{ext}*): " + libloc
-                            )
-                        base = base[: base.index(ext)] + ext
-                    else:
-                        raise ConanException(
-                            f"Invalid lib (expected *{ext}): " + libloc
-                        )
-                if not libname:
-                    libname = base[: -len(ext)]
-                dst = os.path.join(destdir, libname + ext)
-
-                if self.settings.os == "Windows":
-                    if dst != libloc:
-                        # self.output.verbose("Moving %s -> %s" %(libloc, dst))
-                        rename(
-                            self,
-                            os.path.join(self.package_folder, libloc),
-                            os.path.join(self.package_folder, dst),
-                        )
-
-            if implib:
-                base = os.path.basename(implib.lower())
-                if self.settings.os == "Windows":
-                    ext = ".lib"
-                    if not base.endswith(ext):
-                        raise ConanException(
-                            f"Invalid implib (expected *{ext}): " + implib
-                        )
-                    if not libname:
-                        raise ConanException(
-                            f"Missing DLL for implib {base}: " + implib
-                        )
+            comp["libname"] = self._move_library(libloc, comp["src_implib"])
+            for entry in comp.get("configs", {}).values():
+                if entry["src_libloc"] == libloc:
+                    # settings.build_type, already done
+                    entry["libname"] = comp["libname"]
                 else:
-                    raise ConanException(
-                        "Invalid implib (not expected for OS): " + implib
-                    )
-                dst = os.path.join("lib", libname + ext)
-                if dst != implib:
-                    # self.output.verbose("Moving %s -> %s" %(implib, dst))
-                    rename(
-                        self,
-                        os.path.join(self.package_folder, implib),
-                        os.path.join(self.package_folder, dst),
+                    entry["libname"] = self._move_library(
+                        entry["src_libloc"], entry["src_implib"]
                     )
 
-            if libname:
-                if self.settings.os != "Windows":
-                    # Tested with Linux. Assume same with Macos
-                    if not libname.startswith("lib"):
-                        raise ConanException(
-                            "Invalid wxWidgets library, not starting with 'lib': "
-                            + implib
-                        )
-                    libname = libname[3:]
-                comp["libname"] = libname
+            if libloc and self.options.shared and self.settings.os == "Linux":
+                stats = self._elf_link_stats(os.path.join(self.package_folder, libloc))
+                if stats is None:
+                    self.output.warning("readelf not found, no link statistics recorded")
+                else:
+                    comp["link_stats"] = stats
+                    if self.options.shared_link_profile != "off":
+                        # Only keep system libraries the library really links to
+                        comp["system_libs"] = [
+                            lib
+                            for lib in comp["system_libs"]
+                            if any(n.startswith(f"lib{lib}.so") for n in stats["needed"])
+                        ]
+
+            if comp["alias"]:
+                continue
 
             # Fix for shared libraries not in requires
             # _comp_add_deptarget handles platform and settings
-            if comp["name"] == "base":
+            names = [comp["name"]]
+            if comp["name"] == "mono":
+                names = [c["name"] for c in comps.values() if c["alias"] == "mono"]
+            if "base" in names:
                 self._comp_add_deptarget("zlib::zlib", comp)
-            elif comp["name"] == "core":
+            if "core" in names:
                 self._comp_add_deptarget("jpeg::jpeg", comp)
                 self._comp_add_deptarget("tiff::tiff", comp)
                 self._comp_add_deptarget("png::png", comp)
                 self._comp_add_deptarget("expat::expat", comp)
                 self._comp_add_deptarget("nanosvg::nanosvg", comp)
-            elif comp["name"] == "xml":
+            if "xml" in names:
                 self._comp_add_deptarget("expat::expat", comp)
-            elif comp["name"] == "gl":
+            if "gl" in names:
                 self._comp_add_deptarget("opengl::opengl", comp)
                 self._comp_add_deptarget("opengl::glu", comp)
                 self._comp_add_deptarget("opengl::egl", comp)
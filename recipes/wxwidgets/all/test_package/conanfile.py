@@ -1,16 +1,36 @@
+import json
+import math
 import os
+import statistics
+import subprocess
+import time
 
 from conan import ConanFile
 from conan.tools.build import can_run
-from conan.tools.cmake import CMake, cmake_layout
+from conan.tools.cmake import CMake, CMakeToolchain, cmake_layout
 from conan.tools.env import VirtualRunEnv
 
 
 class wxwidgetsTestConan(ConanFile):
     settings = "os", "compiler", "build_type", "arch"
-    generators = "CMakeDeps", "CMakeToolchain"
+    generators = "CMakeDeps"
 
     def generate(self):
+        tc = CMakeToolchain(self)
+        gc_sections = self.dependencies[self.tested_reference_str].options.get_safe(
+            "gc_sections", "off"
+        )
+        tc.variables["WX_GC_SECTIONS"] = (
+            gc_sections != "off" and self.settings.os != "Macos"
+        )
+        profiling = self.dependencies[self.tested_reference_str].options.get_safe(
+            "profiling", "off"
+        )
+        tc.variables["WX_PROFILING"] = (
+            profiling != "off" and self.settings.os == "Linux"
+        )
+        tc.generate()
+
         ms = VirtualRunEnv(self)
         ms.generate()
 
@@ -25,7 +45,128 @@ class wxwidgetsTestConan(ConanFile):
     def layout(self):
         cmake_layout(self)
 
+    @property
+    def _benchmark_runs(self):
+        """
+        Number of benchmark runs, 0 if benchmark mode is off. Enabled with
+        conf user.wxwidgets:benchmark=True or env WXWIDGETS_BENCHMARK=1, runs set
+        with conf user.wxwidgets:benchmark_runs or env WXWIDGETS_BENCHMARK_RUNS
+        """
+        enabled = self.conf.get("user.wxwidgets:benchmark", check_type=bool)
+        if enabled is None:
+            enabled = os.environ.get("WXWIDGETS_BENCHMARK", "0") not in ["", "0"]
+        if not enabled:
+            return 0
+        runs = self.conf.get("user.wxwidgets:benchmark_runs", check_type=int)
+        if runs is None:
+            runs = int(os.environ.get("WXWIDGETS_BENCHMARK_RUNS", "10"))
+        return max(runs, 1)
+
+    def _run_benchmark(self, cmd, runs):
+        """
+        Run cmd 'runs' times and summarize the "WXBENCH {json}" lines it prints
+        together with the externally measured process wall time
+        """
+        samples = {}
+        env = VirtualRunEnv(self).vars()
+        with env.apply():
+            for _ in range(runs):
+                os.environ["WXBENCH_SPAWN_NS"] = str(time.time_ns())
+                start = time.perf_counter()
+                out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+                wall = (time.perf_counter() - start) * 1000.0
+                samples.setdefault("process_wall_ms", []).append(wall)
+                for line in out.stdout.splitlines():
+                    if line.startswith("WXBENCH "):
+                        for key, value in json.loads(line[8:]).items():
+                            if value >= 0:
+                                samples.setdefault(key, []).append(value)
+
+        results = {}
+        for key, values in samples.items():
+            values.sort()
+            results[key] = {
+                "median": round(statistics.median(values), 3),
+                "p95": round(values[math.ceil(len(values) * 0.95) - 1], 3),
+                "runs": len(values),
+            }
+        return results
+
+    def _run_image_benchmark(self, runs):
+        """
+        Run image_benchmark on a corpus generated in the build folder and return
+        its per image/codec results
+        """
+        cmd = [
+            os.path.join(self.cpp.build.bindir, "image_benchmark"),
+            str(runs),
+            os.path.join(self.build_folder, "image_corpus"),
+        ]
+        env = VirtualRunEnv(self).vars()
+        with env.apply():
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        for line in out.stdout.splitlines():
+            if line.startswith("WXIMGBENCH "):
+                return json.loads(line[11:])
+        return []
+
+    def _save_benchmark(self, name, results):
+        dep = self.dependencies[self.tested_reference_str]
+        data = {
+            "reference": str(dep.ref),
+            "settings": {k: str(v) for k, v in self.settings.items()},
+            "options": {k: str(v) for k, v in dep.options.serialize().items()},
+            "results": results,
+        }
+        fn = os.path.join(self.build_folder, name)
+        with open(fn, "w") as f:
+            json.dump(data, f, indent=2)
+        self.output.info(f"Benchmark results saved to {fn}")
+
     def test(self):
         if can_run(self):
             cmd = os.path.join(self.cpp.build.bindir, "test_package")
             self.run(cmd, env="conanrun")
+
+            nogc = os.path.join(self.cpp.build.bindir, "test_package_nogc")
+            if os.path.isfile(nogc):
+                size = os.path.getsize(cmd)
+                size_nogc = os.path.getsize(nogc)
+                self.output.info(
+                    "test_package: %d bytes with --gc-sections, %d without (%.1f%% smaller)"
+                    % (size, size_nogc, 100.0 * (size_nogc - size) / size_nogc)
+                )
+
+            stack_walk = os.path.join(self.cpp.build.bindir, "stack_walk")
+            if os.path.isfile(stack_walk):
+                self.run(stack_walk, env="conanrun")
+
+            dep = self.dependencies[self.tested_reference_str]
+            if dep.options.get_safe("pgo") == "generate":
+                # Writes the profiles for a wxwidgets build with pgo=use
+                self.run(f"{cmd} --workload", env="conanrun")
+
+            runs = self._benchmark_runs
+            if runs:
+                results = self._run_benchmark([cmd, "--benchmark"], runs)
+                for key, value in results.items():
+                    self.output.info(
+                        "%36s: median %9.3f  p95 %9.3f"
+                        % (key, value["median"], value["p95"])
+                    )
+                self._save_benchmark("startup_benchmark.json", results)
+
+                images = self._run_image_benchmark(runs)
+                for r in images:
+                    self.output.info(
+                        "%5s %-9s %4dpx: %9.3f ms  %8.1f MB/s  %7.1f MPix/s"
+                        % (
+                            r["format"],
+                            r["op"],
+                            r["size"],
+                            r["ms_median"],
+                            r["mb_s"],
+                            r["mpix_s"],
+                        )
+                    )
+                self._save_benchmark("image_benchmark.json", images)
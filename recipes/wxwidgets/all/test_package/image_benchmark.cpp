@@ -0,0 +1,204 @@
+// Image codec throughput benchmark, run by test_package in benchmark mode.
+// Generates a corpus of JPEG/PNG/TIFF/SVG images in several sizes and times
+// wxImage::LoadFile, wxImage::SaveFile and SVG rasterization via wxBitmapBundle.
+// Usage: image_benchmark [repeats] [corpus dir]
+// Prints one JSON line prefixed "WXIMGBENCH ".
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+#include <cstdlib>
+#include <iomanip>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+#include <wx/app.h>
+#include <wx/bmpbndl.h>
+#include <wx/ffile.h>
+#include <wx/filename.h>
+#include <wx/image.h>
+#include <wx/init.h>
+#include <wx/mstream.h>
+
+namespace
+{
+
+typedef std::chrono::steady_clock Clock;
+
+const int Sizes[] = {256, 1024, 2048};
+
+struct Format
+{
+    const char * name;
+    wxBitmapType type;
+};
+
+const Format Formats[] = {
+    {"jpeg", wxBITMAP_TYPE_JPEG},
+    {"png", wxBITMAP_TYPE_PNG},
+    {"tiff", wxBITMAP_TYPE_TIFF},
+};
+
+double MsSince(Clock::time_point start)
+{
+    return std::chrono::duration<double, std::milli>(Clock::now() - start).count();
+}
+
+double Median(std::vector<double> values)
+{
+    std::sort(values.begin(), values.end());
+    return values[values.size() / 2];
+}
+
+// Smooth gradients with rings and some noise, compresses like a photo rather
+// than like a flat test pattern
+wxImage MakeImage(int size)
+{
+    wxImage image(size, size);
+    unsigned char * p = image.GetData();
+    unsigned int seed = 12345;
+    for (int y = 0; y < size; ++y) {
+        for (int x = 0; x < size; ++x) {
+            seed = seed * 1103515245 + 12345;
+            int noise = (seed >> 16) % 24;
+            double dx = x - size / 2.0;
+            double dy = y - size / 3.0;
+            double ring = 0.5 + 0.5 * std::sin(std::sqrt(dx * dx + dy * dy) / (size / 32.0));
+            *p++ = (unsigned char)std::min(255, x * 200 / size + noise);
+            *p++ = (unsigned char)std::min(255, (int)(ring * 200) + noise);
+            *p++ = (unsigned char)std::min(255, y * 200 / size + noise);
+        }
+    }
+    return image;
+}
+
+std::string MakeSvg()
+{
+    std::ostringstream svg;
+    svg << "<svg xmlns=\"http://www.w3.org/2000/svg\" viewBox=\"0 0 100 100\">";
+    for (int i = 0; i < 40; ++i) {
+        svg << "<circle cx=\"" << (i * 37) % 100 << "\" cy=\"" << (i * 53) % 100
+            << "\" r=\"" << 5 + i % 15 << "\" fill=\"#" << std::hex << std::setw(6)
+            << std::setfill('0') << (i * 0x3f5a7) % 0xffffff << std::dec
+            << "\" fill-opacity=\"0.6\"/>";
+        svg << "<path d=\"M" << i * 2 << " 0 Q50 " << 100 - i << " 100 " << i * 2
+            << "\" stroke=\"#204080\" fill=\"none\"/>";
+    }
+    svg << "</svg>";
+    return svg.str();
+}
+
+struct Result
+{
+    std::string format;
+    std::string op;
+    int size;
+    size_t bytes;
+    double ms;
+};
+
+std::string ToJson(const std::vector<Result> & results)
+{
+    std::ostringstream json;
+    json << "[";
+    for (size_t i = 0; i < results.size(); ++i) {
+        const Result & r = results[i];
+        double mb_s = r.ms > 0 ? r.bytes / 1e6 / (r.ms / 1e3) : 0;
+        double mpix_s = r.ms > 0 ? (double)r.size * r.size / 1e6 / (r.ms / 1e3) : 0;
+        json << (i ? ", " : "") << "{\"format\": \"" << r.format << "\", \"op\": \"" << r.op
+             << "\", \"size\": " << r.size << ", \"bytes\": " << r.bytes
+             << ", \"ms_median\": " << r.ms << ", \"mb_s\": " << mb_s
+             << ", \"mpix_s\": " << mpix_s << "}";
+    }
+    json << "]";
+    return json.str();
+}
+
+void BenchmarkFormat(const Format & format, const wxString & corpus, int repeats,
+                     std::vector<Result> & results)
+{
+    for (int size : Sizes) {
+        wxImage source = MakeImage(size);
+        wxFileName fn(corpus, wxString::Format("%s_%d.%s", format.name, size, format.name));
+        if (!fn.FileExists() && !source.SaveFile(fn.GetFullPath(), format.type)) {
+            std::cerr << "Could not write " << fn.GetFullPath() << std::endl;
+            continue;
+        }
+
+        std::vector<double> times;
+        for (int i = 0; i < repeats; ++i) {
+            wxImage image;
+            Clock::time_point start = Clock::now();
+            image.LoadFile(fn.GetFullPath(), format.type);
+            times.push_back(MsSince(start));
+        }
+        Result load = {format.name, "load", size, (size_t)fn.GetSize().GetValue(), Median(times)};
+        results.push_back(load);
+
+        times.clear();
+        for (int i = 0; i < repeats; ++i) {
+            wxMemoryOutputStream out;
+            Clock::time_point start = Clock::now();
+            source.SaveFile(out, format.type);
+            times.push_back(MsSince(start));
+        }
+        Result save = {format.name, "save", size, (size_t)size * size * 3, Median(times)};
+        results.push_back(save);
+    }
+}
+
+#ifdef wxHAS_SVG
+void BenchmarkSvg(const wxString & corpus, int repeats, std::vector<Result> & results)
+{
+    wxFileName fn(corpus, "drawing.svg");
+    std::string svg = MakeSvg();
+    wxFFile file(fn.GetFullPath(), "wb");
+    file.Write(svg.c_str(), svg.size());
+    file.Close();
+
+    for (int size : Sizes) {
+        std::vector<double> times;
+        for (int i = 0; i < repeats; ++i) {
+            Clock::time_point start = Clock::now();
+            wxBitmapBundle bundle = wxBitmapBundle::FromSVG(svg.c_str(), wxSize(size, size));
+            bundle.GetBitmap(wxSize(size, size));
+            times.push_back(MsSince(start));
+        }
+        Result raster = {"svg", "rasterize", size, svg.size(), Median(times)};
+        results.push_back(raster);
+    }
+}
+#endif
+
+}
+
+int main(int argc, char * argv[])
+{
+    int repeats = argc > 1 ? std::max(1, std::atoi(argv[1])) : 5;
+    wxString corpus = argc > 2 ? wxString(argv[2]) : wxString("image_corpus");
+
+    int wxargc = 0;
+    wxChar * wxargv[] = {NULL};
+    // wxBitmapBundle needs an initialized GUI
+    wxApp::SetInstance(new wxApp());
+    if (!wxEntryStart(wxargc, wxargv)) {
+        std::cerr << "wxEntryStart failed!" << std::endl;
+        return EXIT_FAILURE;
+    }
+    wxInitAllImageHandlers();
+    if (!wxFileName::DirExists(corpus))
+        wxFileName::Mkdir(corpus, wxS_DIR_DEFAULT, wxPATH_MKDIR_FULL);
+
+    std::vector<Result> results;
+    for (const Format & format : Formats) {
+        if (wxImage::FindHandler(format.type))
+            BenchmarkFormat(format, corpus, repeats, results);
+    }
+#ifdef wxHAS_SVG
+    BenchmarkSvg(corpus, repeats, results);
+#endif
+
+    std::cout << "WXIMGBENCH " << ToJson(results) << std::endl;
+    wxEntryCleanup();
+    return EXIT_SUCCESS;
+}
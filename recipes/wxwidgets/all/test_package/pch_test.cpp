@@ -0,0 +1,10 @@
+// Built by test_package with the precompiled headers of the package, through
+// wx::pch and through wx_target_precompile_headers()
+#include <cstdlib>
+#include <wx/string.h>
+
+int main()
+{
+    wxString text("pch");
+    return text.Len() == 3 ? EXIT_SUCCESS : EXIT_FAILURE;
+}
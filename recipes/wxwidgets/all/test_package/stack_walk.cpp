@@ -0,0 +1,84 @@
+// Frame pointer stack walk, run by test_package when wxwidgets was built with
+// option profiling (Linux). Walks the frame pointer chain the way perf
+// --call-graph fp and eBPF profilers do, from a wxModule initialized by
+// wxEntryStart, resolves the return addresses with dladdr() and fails unless
+// the walk reaches wxEntryStart.
+#include <cstdlib>
+#include <dlfcn.h>
+#include <iostream>
+#include <string>
+#include <vector>
+#include <wx/init.h>
+#include <wx/module.h>
+
+namespace
+{
+
+std::vector<std::string> g_stack;
+
+// Frame record of x86_64 and aarch64: saved frame pointer, return address
+struct FrameRecord
+{
+    const FrameRecord * next;
+    void * ret;
+};
+
+__attribute__((noinline)) void WalkStack()
+{
+    const FrameRecord * frame = static_cast<const FrameRecord *>(__builtin_frame_address(0));
+    for (int depth = 0; frame && depth < 128; ++depth) {
+        Dl_info info;
+        if (dladdr(frame->ret, &info) && info.dli_sname)
+            g_stack.push_back(info.dli_sname);
+        else
+            g_stack.push_back("??");
+        // The chain goes up the stack, anything else means it is broken
+        const char * next = reinterpret_cast<const char *>(frame->next);
+        const char * current = reinterpret_cast<const char *>(frame);
+        if (next <= current || next - current > (1 << 20))
+            break;
+        frame = frame->next;
+    }
+}
+
+}
+
+class StackWalkModule : public wxModule
+{
+public:
+    bool OnInit() override
+    {
+        WalkStack();
+        return true;
+    }
+    void OnExit() override {}
+
+private:
+    wxDECLARE_DYNAMIC_CLASS(StackWalkModule);
+};
+
+wxIMPLEMENT_DYNAMIC_CLASS(StackWalkModule, wxModule);
+
+int main()
+{
+    int argc = 0;
+    wxChar * argv[] = {NULL};
+    if (!wxEntryStart(argc, argv)) {
+        std::cerr << "wxEntryStart failed!" << std::endl;
+        return EXIT_FAILURE;
+    }
+    wxEntryCleanup();
+
+    bool found = false;
+    for (size_t i = 0; i < g_stack.size(); ++i) {
+        std::cout << "#" << i << " " << g_stack[i] << std::endl;
+        if (g_stack[i].find("wxEntryStart") != std::string::npos)
+            found = true;
+    }
+    if (!found) {
+        std::cerr << "Frame pointer stack walk did not reach wxEntryStart" << std::endl;
+        return EXIT_FAILURE;
+    }
+    std::cout << "Frame pointer stack walk resolved through wxEntryStart" << std::endl;
+    return EXIT_SUCCESS;
+}
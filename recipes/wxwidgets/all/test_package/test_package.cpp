@@ -1,19 +1,217 @@
+#include <chrono>
 #include <cstdlib>
+#include <cstring>
 #include <iostream>
+#include <sstream>
+#include <string>
+#include <wx/app.h>
+#include <wx/dcmemory.h>
+#include <wx/frame.h>
+#include <wx/image.h>
+#include <wx/mstream.h>
+#include <wx/panel.h>
+#include <wx/sizer.h>
+#include <wx/stattext.h>
 #include <wx/utils.h>
 #include <wx/init.h>
 #if wxUSE_STC
 #include <wx/stc/stc.h>
 #endif
+#if wxUSE_AUI
+#include <wx/aui/aui.h>
+#endif
+#if wxUSE_GLCANVAS
+#include <wx/glcanvas.h>
+#endif
+#if wxUSE_HTML
+#include <wx/html/htmlwin.h>
+#endif
+#if wxUSE_WEBVIEW
+#include <wx/webview.h>
+#endif
+
+namespace
+{
+
+typedef std::chrono::steady_clock Clock;
+
+double MsSince(Clock::time_point start)
+{
+    return std::chrono::duration<double, std::milli>(Clock::now() - start).count();
+}
+
+// Milliseconds since the harness spawned us (WXBENCH_SPAWN_NS, ns since epoch), or -1
+double MsSinceSpawn()
+{
+    const char * spawn = std::getenv("WXBENCH_SPAWN_NS");
+    if (!spawn)
+        return -1.0;
+    long long now = std::chrono::duration_cast<std::chrono::nanoseconds>(
+        std::chrono::system_clock::now().time_since_epoch()).count();
+    return (now - std::atoll(spawn)) / 1e6;
+}
+
+// Times process start, wxEntryStart, creation of the first window of each
+// linked component and wxEntryCleanup. Prints one JSON line prefixed "WXBENCH ".
+// Needs a display as a GUI wxApp is initialized.
+int RunBenchmark()
+{
+    std::ostringstream json;
+    json << "{\"process_start_to_main_ms\": " << MsSinceSpawn();
+
+    int argc = 0;
+    wxChar * argv[] = {NULL};
+    wxApp::SetInstance(new wxApp());
+    Clock::time_point start = Clock::now();
+    if (!wxEntryStart(argc, argv)) {
+        std::cerr << "wxEntryStart failed!" << std::endl;
+        return EXIT_FAILURE;
+    }
+    json << ", \"entry_start_ms\": " << MsSince(start)
+         << ", \"process_start_to_entry_start_ms\": " << MsSinceSpawn();
+
+    start = Clock::now();
+    wxFrame * frame = new wxFrame(NULL, wxID_ANY, "benchmark");
+    json << ", \"init_core_ms\": " << MsSince(start);
+
+#if wxUSE_STC
+    start = Clock::now();
+    new wxStyledTextCtrl(frame);
+    json << ", \"init_stc_ms\": " << MsSince(start);
+#endif
+#if wxUSE_AUI
+    start = Clock::now();
+    wxAuiManager * aui = new wxAuiManager(frame);
+    aui->AddPane(new wxPanel(frame), wxAuiPaneInfo().CenterPane());
+    aui->Update();
+    json << ", \"init_aui_ms\": " << MsSince(start);
+#endif
+#if wxUSE_GLCANVAS
+    start = Clock::now();
+    new wxGLCanvas(frame);
+    json << ", \"init_gl_ms\": " << MsSince(start);
+#endif
+#if wxUSE_HTML
+    start = Clock::now();
+    wxHtmlWindow * html = new wxHtmlWindow(frame);
+    html->SetPage("<p>wxWidgets</p>");
+    json << ", \"init_html_ms\": " << MsSince(start);
+#endif
+#if wxUSE_WEBVIEW
+    if (wxWebView::IsBackendAvailable(wxWebViewBackendDefault)) {
+        start = Clock::now();
+        wxWebView::New(frame, wxID_ANY);
+        json << ", \"init_webview_ms\": " << MsSince(start);
+    }
+#endif
+
+#if wxUSE_AUI
+    aui->UnInit();
+    delete aui;
+#endif
+    frame->Destroy();
+
+    start = Clock::now();
+    wxEntryCleanup();
+    json << ", \"entry_cleanup_ms\": " << MsSince(start) << "}";
+    std::cout << "WXBENCH " << json.str() << std::endl;
+    return EXIT_SUCCESS;
+}
 
-int main()
+// Training workload for profile-guided optimization (wxwidgets option pgo=generate):
+// event dispatch, sizer layout, drawing to a wxMemoryDC and image decoding.
+// Needs a display as a GUI wxApp is initialized.
+int RunWorkload()
 {
     int argc = 0;
     wxChar * argv[] = {NULL};
+    wxApp::SetInstance(new wxApp());
     if (!wxEntryStart(argc, argv)) {
         std::cerr << "wxEntryStart failed!" << std::endl;
         return EXIT_FAILURE;
     }
+    wxInitAllImageHandlers();
+    wxFrame * frame = new wxFrame(NULL, wxID_ANY, "workload");
+
+    int handled = 0;
+    frame->Bind(wxEVT_BUTTON, [&handled](wxCommandEvent & event) {
+        ++handled;
+        event.Skip();
+    });
+    for (int i = 0; i < 100000; ++i) {
+        wxCommandEvent event(wxEVT_BUTTON, i % 100);
+        frame->GetEventHandler()->ProcessEvent(event);
+    }
+
+    wxPanel * panel = new wxPanel(frame);
+    wxBoxSizer * column = new wxBoxSizer(wxVERTICAL);
+    for (int row = 0; row < 20; ++row) {
+        wxBoxSizer * line = new wxBoxSizer(wxHORIZONTAL);
+        for (int col = 0; col < 10; ++col) {
+            wxString label = wxString::Format("%d:%d", row, col);
+            line->Add(new wxStaticText(panel, wxID_ANY, label), 1, wxALL | wxEXPAND, 2);
+        }
+        column->Add(line, 0, wxEXPAND);
+    }
+    panel->SetSizer(column);
+    for (int i = 0; i < 200; ++i) {
+        panel->SetSize(400 + i % 300, 300 + i % 200);
+        panel->Layout();
+    }
+
+    wxBitmap bitmap(800, 600);
+    {
+        wxMemoryDC dc(bitmap);
+        for (int i = 0; i < 100; ++i) {
+            dc.SetBackground(*wxWHITE_BRUSH);
+            dc.Clear();
+            dc.SetPen(wxPen(wxColour(i, 0, 255 - i), 1 + i % 4));
+            dc.SetBrush(wxBrush(wxColour(0, i, 128)));
+            for (int j = 0; j < 50; ++j) {
+                dc.DrawLine(j * 16, 0, 800 - j * 16, 600);
+                dc.DrawRectangle(j * 15, j * 11, 40, 30);
+                dc.DrawEllipse(j * 13, 600 - j * 11, 30, 20);
+            }
+            dc.DrawText(wxString::Format("frame %d", i), 10, 10);
+        }
+    }
+
+    wxImage image = bitmap.ConvertToImage();
+    const wxBitmapType types[] = {wxBITMAP_TYPE_PNG, wxBITMAP_TYPE_JPEG};
+    for (wxBitmapType type : types) {
+        if (!wxImage::FindHandler(type))
+            continue;
+        wxMemoryOutputStream out;
+        image.SaveFile(out, type);
+        for (int i = 0; i < 20; ++i) {
+            wxMemoryInputStream in(out);
+            wxImage decoded;
+            decoded.LoadFile(in, type);
+            decoded.Rescale(400, 300, wxIMAGE_QUALITY_HIGH);
+        }
+    }
+
+    frame->Destroy();
+    wxEntryCleanup();
+    std::cout << "Workload done, " << handled << " events handled" << std::endl;
+    return EXIT_SUCCESS;
+}
+
+}
+
+int main(int argc, char * argv[])
+{
+    if (argc > 1 && std::strcmp(argv[1], "--benchmark") == 0)
+        return RunBenchmark();
+    if (argc > 1 && std::strcmp(argv[1], "--workload") == 0)
+        return RunWorkload();
+
+    int wxargc = 0;
+    wxChar * wxargv[] = {NULL};
+    if (!wxEntryStart(wxargc, wxargv)) {
+        std::cerr << "wxEntryStart failed!" << std::endl;
+        return EXIT_FAILURE;
+    }
     wxVersionInfo vi = wxGetLibraryVersionInfo();
     std::cout << "wxWidgets version: "
               << vi.GetMajor() << "."
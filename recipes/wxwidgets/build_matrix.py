@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Build matrix timing for the wxwidgets recipe.
+
+Runs 'conan create' for every combination of the given option/setting values,
+in parallel, each job with its own CONAN_HOME (the Conan cache is not safe for
+concurrent writes). Reports wall time per phase (dependencies, source,
+configure, build, package, test), package size and compiler cache hit rate as
+a table and as JSON.
+
+Example:
+    ./build_matrix.py -o shared=True,False -o webview=True,False \\
+        -s build_type=Release,Debug -j 2 --compiler-cache ccache \\
+        --json matrix.json -- -c tools.build:jobs=8
+
+Arguments after '--' are passed to every 'conan create'.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+RECIPE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Log lines starting a phase, the previous phase ends there. Only lines of the
+# wxwidgets node count, dependencies built with --build missing log the same
+# markers and stay in "dependencies". The test section header has no prefix.
+PHASE_MARKERS = [
+    ("source", "Calling source()"),
+    ("configure", "Running CMake.configure()"),
+    ("build", "Running CMake.build()"),
+    ("package", "Calling package()"),
+]
+TEST_MARKER = "Testing the package"
+WXWIDGETS_LINE = re.compile(r"^wxwidgets/[^\s:]+: ")
+PHASES = ["dependencies"] + [name for name, _ in PHASE_MARKERS] + ["test"]
+
+print_lock = threading.Lock()
+
+
+def parse_axes(values):
+    """
+    ["shared=True,False", ...] -> [("shared", ["True", "False"]), ...]
+    """
+    axes = []
+    for value in values:
+        name, sep, choices = value.partition("=")
+        if not sep or not choices:
+            raise SystemExit(f"Invalid axis '{value}', expected name=value1,value2")
+        axes.append((name, [c.strip() for c in choices.split(",") if c.strip()]))
+    return axes
+
+
+def combinations(option_axes, setting_axes):
+    """
+    Cartesian product of all axes as [{"options": {...}, "settings": {...}}, ...]
+    """
+    axes = [("options", n, v) for n, v in option_axes]
+    axes += [("settings", n, v) for n, v in setting_axes]
+    result = []
+    for values in itertools.product(*[choices for _, _, choices in axes]):
+        combo = {"options": {}, "settings": {}}
+        for (kind, name, _), value in zip(axes, values):
+            combo[kind][name] = value
+        result.append(combo)
+    return result
+
+
+def describe(combo):
+    items = [f"{k}={v}" for k, v in combo["settings"].items()]
+    items += [f"{k}={v}" for k, v in combo["options"].items()]
+    return " ".join(items) or "defaults"
+
+
+def folder_size(folder):
+    total = 0
+    for root, _, files in os.walk(folder):
+        for file in files:
+            fn = os.path.join(root, file)
+            if not os.path.islink(fn):
+                total += os.path.getsize(fn)
+    return total
+
+
+def find_package_folder(graph, name):
+    """
+    Package folder of the tested package in 'conan create --format=json' output
+    """
+    for node in graph.get("graph", {}).get("nodes", {}).values():
+        if str(node.get("ref", "")).startswith(f"{name}/") and node.get(
+            "package_folder"
+        ):
+            return node["package_folder"]
+    return None
+
+
+def run_job(index, combo, args, conan_args):
+    """
+    'conan create' for one combination, returns its result record
+    """
+    home = os.path.join(args.workdir, f"home{index}")
+    env = dict(os.environ, CONAN_HOME=home)
+    os.makedirs(home, exist_ok=True)
+    if args.config:
+        setup = [args.conan, "config", "install", args.config]
+    else:
+        setup = [args.conan, "profile", "detect", "--force"]
+    subprocess.run(setup, env=env, check=True, capture_output=True)
+
+    cmd = [args.conan, "create", args.recipe, "--version", args.version]
+    cmd += ["--build", "missing", "--format", "json"]
+    for name, value in combo["settings"].items():
+        cmd += ["-s", f"{name}={value}"]
+    for name, value in combo["options"].items():
+        cmd += ["-o", f"wxwidgets/*:{name}={value}"]
+    if args.compiler_cache:
+        cmd += ["-o", f"wxwidgets/*:compiler_cache={args.compiler_cache}"]
+        cmd += ["-c", f"user.wxwidgets:compiler_cache_dir={args.cache_dir}"]
+    cmd += conan_args
+
+    log_fn = os.path.join(args.workdir, f"job{index}.log")
+    phases = {}
+    current, current_start = "dependencies", time.monotonic()
+    start = current_start
+    with open(log_fn, "w") as log, tempfile.TemporaryFile("w+") as stdout:
+        proc = subprocess.Popen(
+            cmd, env=env, stdout=stdout, stderr=subprocess.PIPE, text=True
+        )
+        # Conan logs to stderr, the JSON graph goes to stdout
+        for line in proc.stderr:
+            log.write(line)
+            if WXWIDGETS_LINE.match(line):
+                markers = PHASE_MARKERS
+            else:
+                markers = [("test", TEST_MARKER)]
+            for name, marker in markers:
+                if marker in line and name not in phases and name != current:
+                    now = time.monotonic()
+                    phases[current] = phases.get(current, 0.0) + now - current_start
+                    current, current_start = name, now
+        returncode = proc.wait()
+        end = time.monotonic()
+        phases[current] = phases.get(current, 0.0) + end - current_start
+        stdout.seek(0)
+        output = stdout.read()
+
+    result = {
+        "combination": combo,
+        "status": "ok" if returncode == 0 else f"failed ({returncode})",
+        "log": log_fn,
+        "phases_s": {name: round(phases.get(name, 0.0), 1) for name in PHASES},
+        "total_s": round(end - start, 1),
+        "package_bytes": None,
+        "cache_hit_rate": None,
+    }
+    if returncode == 0:
+        try:
+            folder = find_package_folder(json.loads(output), "wxwidgets")
+        except ValueError:
+            folder = None
+        if folder:
+            result["package_bytes"] = folder_size(folder)
+            stats_fn = os.path.join(folder, "pkg", "compiler_cache_stats.json")
+            if os.path.isfile(stats_fn):
+                with open(stats_fn) as f:
+                    result["cache_hit_rate"] = json.load(f).get("hit_rate")
+    if not args.keep_homes:
+        shutil.rmtree(home, ignore_errors=True)
+
+    with print_lock:
+        print(f"[{index}] {describe(combo)}: {result['status']} in {result['total_s']}s")
+    return result
+
+
+def print_table(results):
+    headers = ["#", "combination", "status"] + PHASES + ["total", "size MB", "hits"]
+    rows = []
+    for index, r in enumerate(results):
+        size = r["package_bytes"]
+        hits = r["cache_hit_rate"]
+        rows.append(
+            [str(index), describe(r["combination"]), r["status"]]
+            + ["%.1f" % r["phases_s"][name] for name in PHASES]
+            + [
+                "%.1f" % r["total_s"],
+                "%.1f" % (size / 1e6) if size is not None else "-",
+                "%.0f%%" % (hits * 100) if hits is not None else "-",
+            ]
+        )
+    widths = [max(len(row[i]) for row in rows + [headers]) for i in range(len(headers))]
+    for row in [headers] + rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+
+def main():
+    argv = sys.argv[1:]
+    conan_args = []
+    if "--" in argv:
+        conan_args = argv[argv.index("--") + 1 :]
+        argv = argv[: argv.index("--")]
+
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "-o", "--option", action="append", default=[], help="name=value1,value2,..."
+    )
+    parser.add_argument(
+        "-s", "--setting", action="append", default=[], help="name=value1,value2,..."
+    )
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="parallel jobs")
+    parser.add_argument("--recipe", default=os.path.join(RECIPE_DIR, "all"))
+    parser.add_argument("--conan", default="conan", help="conan executable")
+    parser.add_argument("--version", help="default: latest in config.yml")
+    parser.add_argument(
+        "--config", help="conan config install source for every CONAN_HOME"
+    )
+    parser.add_argument("--compiler-cache", choices=["ccache", "sccache"])
+    parser.add_argument(
+        "--cache-dir",
+        default=os.path.join(os.path.expanduser("~"), ".cache", "wxwidgets-matrix"),
+        help="compiler cache directory shared by all jobs",
+    )
+    parser.add_argument("--workdir", help="default: a temporary directory")
+    parser.add_argument(
+        "--keep-homes", action="store_true", help="keep the CONAN_HOME of every job"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    if not args.version:
+        with open(os.path.join(RECIPE_DIR, "config.yml")) as f:
+            versions = yaml.safe_load(f)["versions"]
+        args.version = max(versions, key=lambda v: [int(p) for p in v.split(".")])
+    if not args.workdir:
+        args.workdir = tempfile.mkdtemp(prefix="wxwidgets-matrix-")
+    os.makedirs(args.workdir, exist_ok=True)
+
+    combos = combinations(parse_axes(args.option), parse_axes(args.setting))
+    print(
+        f"Building {len(combos)} combinations of wxwidgets/{args.version},"
+        f" {args.jobs} at a time, logs in {args.workdir}"
+    )
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [
+            pool.submit(run_job, index, combo, args, conan_args)
+            for index, combo in enumerate(combos)
+        ]
+        results = [future.result() for future in futures]
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())